@@ -1,40 +1,251 @@
 import logging
+import random
+import shutil
+import tempfile
 
 import pytest
-import requests
+import pytest_asyncio
 
-from resources.config import ADMIN, PASSWORD, URL
+from urllib.parse import urlparse
+
+from resources import config
+from resources.async_client import AsyncApiClient
+from resources.brand_pool import BrandPool
+from resources.cache import ResponseCache
+from resources.cleanup import CleanupRegistry
+from resources.client import ApiClient
 from resources.helpers import generate_random_string
+from resources.scheduler import RequestScheduler, merge_stats
+from resources.token_cache import TokenCache
 
 
 logger = logging.getLogger(__name__)
 
 
+def pytest_addoption(parser):
+    parser.addoption(
+        "--response-cache",
+        action="store_true",
+        default=False,
+        help="serve repeated GETs from a client-side cache invalidated by writes to the same resource",
+    )
+    parser.addoption("--response-cache-ttl", type=float, default=30.0, help="response cache TTL in seconds")
+    parser.addoption(
+        "--rate-limit",
+        type=float,
+        default=None,
+        help="requests per second to the API host (default: RATE_LIMIT, 0 = off)",
+    )
+    parser.addoption(
+        "--route-rate-limit",
+        type=float,
+        default=None,
+        help="requests per second to each route (default: ROUTE_RATE_LIMIT, 0 = off)",
+    )
+    parser.addoption(
+        "--max-retries",
+        type=int,
+        default=None,
+        help="retries of throttled and transient failures (default: MAX_RETRIES)",
+    )
+    parser.addoption(
+        "--brand-pool-size", type=int, default=4, help="brands created up front for tests that only need one to exist"
+    )
+    parser.addoption("--fuzz-examples", type=int, default=200, help="payloads sent by the /brands validation fuzz test")
+    parser.addoption("--fuzz-seed", type=int, default=None, help="seed for the fuzz test payloads (default: random)")
+
+
+scheduler_stats_key = pytest.StashKey[dict]()
+token_cache_dir_key = pytest.StashKey[str]()
+
+
+def pytest_configure(config):
+    worker_input = getattr(config, "workerinput", None)
+    if worker_input is not None:
+        # pytest-xdist workers share the token file of the controller's run
+        config.stash[token_cache_dir_key] = worker_input["token_cache_dir"]
+    else:
+        config.stash[token_cache_dir_key] = tempfile.mkdtemp(prefix="token-cache-")
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    node.workerinput["token_cache_dir"] = node.config.stash[token_cache_dir_key]
+
+
+def pytest_unconfigure(config):
+    # tokens must not outlive the run: the next one may face a restarted server or a reused port
+    if not hasattr(config, "workerinput") and token_cache_dir_key in config.stash:
+        shutil.rmtree(config.stash[token_cache_dir_key], ignore_errors=True)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    stats = getattr(node, "workeroutput", {}).get("scheduler_stats")
+    if stats:
+        node.config.stash[scheduler_stats_key] = merge_stats(node.config.stash.get(scheduler_stats_key, {}), stats)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    stats = config.stash.get(scheduler_stats_key, None)
+    if stats:
+        # throttled and retried attempts never reached the tests; they are not failures
+        terminalreporter.write_sep("-", "request scheduler")
+        terminalreporter.write_line(" ".join(f"{name}={value}" for name, value in stats.items()))
+
+
+def _scheduled_client(config):
+    scheduler = RequestScheduler(
+        rate=config.getoption("rate_limit"),
+        route_rate=config.getoption("route_rate_limit"),
+        max_retries=config.getoption("max_retries"),
+    )
+    client = ApiClient(scheduler=scheduler)
+    scheduler.base_path = urlparse(client.base_url).path.rstrip("/")
+    return client
+
+
+def _collect_scheduler_stats(config, stats):
+    stats = merge_stats(config.stash.get(scheduler_stats_key, {}), stats)
+    config.stash[scheduler_stats_key] = stats
+    if hasattr(config, "workeroutput"):
+        config.workeroutput["scheduler_stats"] = stats
+
+
+@pytest.fixture(scope="session")
+def api_client(request):
+    client = _scheduled_client(request.config)
+    scheduler = client.scheduler
+    if request.config.getoption("response_cache"):
+        client.cache = ResponseCache(
+            base_path=urlparse(client.base_url).path, ttl=request.config.getoption("response_cache_ttl")
+        )
+    logger.info(f"Opening pooled HTTP client for {client.base_url}")
+    yield client
+    if client.cache is not None:
+        logger.info(f"Response cache: {client.cache.stats()}")
+    stats = scheduler.stats()
+    logger.info(f"Request scheduler: {stats}")
+    _collect_scheduler_stats(request.config, stats)
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def benchmark_client(brand_cleanup, cassette, profiler):
+    """Client for the uniqueness contention tests only; everything else goes through the scheduler.
+
+    It has no scheduler, so their barrier-released bursts reach the API together instead of queueing behind
+    the concurrency limit, and no latency recording, so their samples stay out of the SLOs and trends.
+    """
+    client = ApiClient()
+    client.hooks["response"].append(brand_cleanup.track)
+    if cassette is not None:
+        cassette.mount(client)
+    if profiler is not None:
+        profiler.install(client)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def fuzz_client(request, brand_cleanup, cassette, profiler):
+    """Client for the validation fuzz test.
+
+    Its bulk ``POST /brands`` traffic is paced and retried by a scheduler of its own, so a 429 is not
+    reported as a fuzz failure, and it records no latency, so the fuzz payloads stay out of the SLOs and trends.
+    """
+    client = _scheduled_client(request.config)
+    client.hooks["response"].append(brand_cleanup.track)
+    if cassette is not None:
+        cassette.mount(client)
+    if profiler is not None:
+        profiler.install(client)
+    yield client
+    _collect_scheduler_stats(request.config, client.scheduler.stats())
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def async_api_client(api_client):
+    client = AsyncApiClient(api_client)
+    yield client
+    client.close()
+
+
+@pytest.fixture(scope="session")
+def token_cache(request, api_client):
+    cache_path = f"{request.config.stash[token_cache_dir_key]}/tokens.json"
+    cache = TokenCache(api_client, path=cache_path)
+    api_client.hooks["response"].append(cache.track)
+    yield cache
+    api_client.hooks["response"].remove(cache.track)
+    logger.info(f"Token cache performed {cache.logins} login(s)")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def brand_cleanup(api_client, token_cache):
+    registry = CleanupRegistry(api_client)
+    api_client.hooks["response"].append(registry.track)
+    yield registry
+    api_client.hooks["response"].remove(registry.track)
+    if registry.pending:
+        registry.drain(token_cache.get(config.ADMIN))
+
+
+@pytest.fixture(scope="session")
+def brand_pool(request, api_client, brand_cleanup):
+    # depends on brand_cleanup so pooled brands are tracked and removed with the rest
+    pool = BrandPool(api_client, size=request.config.getoption("brand_pool_size"))
+    pool.fill()
+    yield pool
+    logger.info(f"Brand pool: {len(pool)} of {pool.size} brand(s) left unused")
+
+
 @pytest.fixture
-def token(request):
-    login_payload = {
-        "email": request.param,
-        "password": PASSWORD
-    }
-    logger.info(f"Generating token for {request.param['email']}")
-    login_response = requests.post(f"{URL}/users/login", json=login_payload, timeout=5)
-    access_token = login_response.json()["access_token"]
-    return access_token
+def token(request, token_cache):
+    logger.info(f"Getting token for {request.param['email']}")
+    return token_cache.get(request.param["email"])
 
 
 @pytest.fixture
-def create_brand():
+def create_brand(api_client):
     payload = {"name": f"name_{generate_random_string(8)}", "slug": f"slug_{generate_random_string(8)}"}
     logger.info(f"Executing POST /brands request with payload: {payload}")
-    create_brand = requests.post(f"{URL}/brands", json=payload, timeout=5)
-    brand_id = create_brand.json()["id"]
-    yield create_brand.json()
-    login_payload = {
-        "email": ADMIN,
-        "password": PASSWORD
-    }
-    login_response = requests.post(f"{URL}/users/login", json=login_payload, timeout=5)
-    access_token = login_response.json()["access_token"]
-    headers = {"Authorization": f"Bearer {access_token}"}
-    logger.info(f"Deleting brand with id: {brand_id}")
-    requests.delete(f"{URL}/brands/{brand_id}", headers=headers, timeout=5)
+    create_brand = api_client.post("/brands", json=payload)
+    # the brand is deleted by brand_cleanup at session end
+    return create_brand.json()
+
+
+@pytest_asyncio.fixture
+async def async_token(request, async_api_client, token_cache):
+    logger.info(f"Getting token for {request.param['email']}")
+    return await async_api_client.run(token_cache.get, request.param["email"])
+
+
+@pytest_asyncio.fixture
+async def async_create_brand(async_api_client):
+    payload = {"name": f"name_{generate_random_string(8)}", "slug": f"slug_{generate_random_string(8)}"}
+    logger.info(f"Executing POST /brands request with payload: {payload}")
+    create_brand = await async_api_client.post("/brands", json=payload)
+    # the brand is deleted by brand_cleanup at session end
+    return create_brand.json()
+
+
+@pytest.fixture
+def pooled_brand(brand_pool):
+    """An existing brand for tests that do not modify or delete it; use ``create_brand`` otherwise."""
+    return brand_pool.checkout()
+
+
+@pytest.fixture(scope="session")
+def fuzz_seed(request, cassette):
+    seed = request.config.getoption("fuzz_seed")
+    if cassette is not None and cassette.mode == "replay":
+        # the payloads must be the ones the cassette was recorded with
+        seed = cassette.meta.get("fuzz_seed", seed)
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    if cassette is not None and cassette.mode == "record":
+        cassette.meta["fuzz_seed"] = seed
+    logger.info(f"Fuzz seed: {seed} (rerun with --fuzz-seed={seed})")
+    return seed
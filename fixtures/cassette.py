@@ -0,0 +1,73 @@
+import logging
+
+import pytest
+
+from urllib.parse import urlparse
+
+from resources import config as api_config
+from resources.cassette import Cassette
+from resources.helpers import reset_generated_strings
+
+
+logger = logging.getLogger(__name__)
+
+cassette_key = pytest.StashKey[Cassette]()
+
+RECORDED_SETTINGS = ("URL", "ADMIN", "USER1", "USER2")
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("cassette", "record/replay of HTTP exchanges")
+    group.addoption("--record-cassette", default=None, metavar="PATH",
+                    help="record every HTTP exchange of the run to PATH")
+    group.addoption("--replay-cassette", default=None, metavar="PATH",
+                    help="serve responses recorded in PATH instead of calling the API")
+
+
+def pytest_configure(config):
+    record_path = config.getoption("record_cassette")
+    replay_path = config.getoption("replay_cassette")
+    if record_path and replay_path:
+        raise pytest.UsageError("--record-cassette and --replay-cassette are mutually exclusive")
+    if (record_path or replay_path) and config.getoption("numprocesses", None):
+        raise pytest.UsageError("cassettes record and replay a single process; run without -n")
+    if record_path:
+        config.stash[cassette_key] = Cassette(record_path, "record", secrets=[api_config.PASSWORD])
+    elif replay_path:
+        cassette = Cassette(replay_path, "replay", secrets=[api_config.PASSWORD])
+        # recorded URL and accounts stand in for a missing environment
+        for name in RECORDED_SETTINGS:
+            if not getattr(api_config, name):
+                setattr(api_config, name, cassette.meta.get(name))
+        config.stash[cassette_key] = cassette
+
+
+def pytest_unconfigure(config):
+    cassette = config.stash.get(cassette_key, None)
+    if cassette is not None:
+        cassette.close()
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    cassette = item.config.stash.get(cassette_key, None)
+    if cassette is not None:
+        cassette.begin(item.nodeid)
+        reset_generated_strings()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def cassette(request, api_client, token_cache):
+    cassette = request.config.stash.get(cassette_key, None)
+    if cassette is None:
+        yield None
+        return
+    logger.info(f"Cassette {cassette.mode} mode")
+    if cassette.mode == "record":
+        cassette.meta.update({name: getattr(api_config, name) for name in RECORDED_SETTINGS})
+    cassette.base_path = urlparse(api_client.base_url).path.rstrip("/")
+    cassette.mount(api_client)
+    # logins must go through the cassette rather than a token cached on disk by another run
+    token_cache.path = None
+    token_cache.invalidate()
+    yield cassette
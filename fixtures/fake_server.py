@@ -0,0 +1,54 @@
+import pytest
+
+from resources import config as api_config
+from resources.fake_server import FakeToolshopServer
+
+fake_server_key = pytest.StashKey[FakeToolshopServer]()
+
+# practicesoftwaretesting.com demo accounts, used when the environment does not provide any
+DEFAULT_ACCOUNTS = {
+    "ADMIN": "admin@practicesoftwaretesting.com",
+    "USER1": "customer@practicesoftwaretesting.com",
+    "USER2": "customer2@practicesoftwaretesting.com",
+}
+DEFAULT_PASSWORD = "welcome01"
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--fake-server",
+        action="store_true",
+        default=False,
+        help="run the suite against an in-process fake Toolshop API on an ephemeral port instead of URL",
+    )
+
+
+def pytest_configure(config):
+    if not config.getoption("fake_server"):
+        return
+    for name, email in DEFAULT_ACCOUNTS.items():
+        if not getattr(api_config, name):
+            setattr(api_config, name, email)
+    api_config.PASSWORD = api_config.PASSWORD or DEFAULT_PASSWORD
+    worker_input = getattr(config, "workerinput", None)
+    if worker_input is not None:
+        # pytest-xdist workers share the server started by the controller
+        api_config.URL = worker_input["fake_server_url"]
+        return
+    accounts = {api_config.ADMIN: "admin", api_config.USER1: "user", api_config.USER2: "user"}
+    server = FakeToolshopServer(accounts, api_config.PASSWORD).start()
+    config.stash[fake_server_key] = server
+    api_config.URL = server.url
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_configure_node(node):
+    server = node.config.stash.get(fake_server_key, None)
+    if server is not None:
+        node.workerinput["fake_server_url"] = server.url
+
+
+def pytest_unconfigure(config):
+    server = config.stash.get(fake_server_key, None)
+    if server is not None:
+        server.stop()
@@ -0,0 +1,78 @@
+import logging
+
+import allure
+import pytest
+
+from urllib.parse import urlparse
+
+from resources.latency import LatencyRecorder, parse_slos
+
+
+logger = logging.getLogger(__name__)
+
+latency_recorder_key = pytest.StashKey[LatencyRecorder]()
+
+
+def pytest_addoption(parser):
+    parser.addini(
+        "latency_slo",
+        type="linelist",
+        default=[],
+        help="per-route latency SLOs in milliseconds, e.g. 'GET /brands p95=800' ('*' for every route)",
+    )
+
+
+latency_violations_key = pytest.StashKey[list]()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    samples = getattr(node, "workeroutput", {}).get("latency_samples")
+    if samples:
+        slos = parse_slos(node.config.getini("latency_slo"))
+        recorder = node.config.stash.setdefault(latency_recorder_key, LatencyRecorder(slos=slos))
+        recorder.merge(samples)
+
+
+def _is_xdist_controller(config):
+    return config.pluginmanager.has_plugin("dsession")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_sessionfinish(session):
+    # under pytest-xdist each worker only sees a slice of the samples; the SLOs hold for the merged run
+    if hasattr(session.config, "workerinput"):
+        return
+    recorder = session.config.stash.get(latency_recorder_key, None)
+    if recorder is None:
+        return
+    if _is_xdist_controller(session.config):
+        logger.info(f"Latency by route (ms):\n{recorder.format_table()}")
+    violations = list(recorder.violations())
+    session.config.stash[latency_violations_key] = violations
+    if violations and session.exitstatus == pytest.ExitCode.OK:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    violations = config.stash.get(latency_violations_key, None)
+    if violations:
+        terminalreporter.write_sep("=", "latency SLO violations", red=True)
+        for route, stat, value, limit in violations:
+            terminalreporter.write_line(f"{route} {stat} (ms): {value:.1f} > {limit:.1f}")
+
+
+@pytest.fixture(scope="session", autouse=True)
+def latency_recorder(request, api_client):
+    slos = parse_slos(request.config.getini("latency_slo"))
+    recorder = LatencyRecorder(base_path=urlparse(api_client.base_url).path, slos=slos)
+    api_client.hooks["response"].append(recorder.hook)
+    request.config.stash[latency_recorder_key] = recorder
+    yield recorder
+    api_client.hooks["response"].remove(recorder.hook)
+    table = recorder.format_table()
+    logger.info(f"Latency by route (ms):\n{table}")
+    allure.attach(table, name="Latency by route (ms)", attachment_type=allure.attachment_type.TEXT)
+    if hasattr(request.config, "workeroutput"):
+        # handed to the controller, which checks the SLOs and feeds the trend store with all workers' samples
+        request.config.workeroutput["latency_samples"] = recorder.samples()
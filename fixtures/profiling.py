@@ -0,0 +1,155 @@
+import json
+import logging
+import time
+
+import allure
+import pytest
+
+from resources.profiling import SESSION_SCOPE, Profiler
+
+
+logger = logging.getLogger(__name__)
+
+profiler_key = pytest.StashKey[Profiler]()
+teardown_started_key = pytest.StashKey[dict]()
+session_teardown_key = pytest.StashKey[dict]()
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("profiling", "per-test timing breakdown")
+    group.addoption("--profile", action="store_true", default=False,
+                    help="break down where the run spends its time per test, fixture and HTTP phase")
+    group.addoption("--profile-json", default=None, metavar="PATH",
+                    help="write the profiling report to PATH as JSON (implies --profile)")
+
+
+def pytest_configure(config):
+    if config.getoption("profile") or config.getoption("profile_json"):
+        config.stash[profiler_key] = Profiler()
+        config.stash[teardown_started_key] = {}
+        config.stash[session_teardown_key] = {}
+
+
+def _profiler(config):
+    return config.stash.get(profiler_key, None)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    profiler = _profiler(node.config)
+    snapshot = getattr(node, "workeroutput", {}).get("profile")
+    if profiler is not None and snapshot:
+        profiler.merge(snapshot)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_protocol(item, nextitem):
+    profiler = _profiler(item.config)
+    if profiler is not None:
+        profiler.current = item.nodeid
+    yield
+    if profiler is not None:
+        profiler.current, profiler.stage = SESSION_SCOPE, None
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_makereport(item, call):
+    outcome = yield
+    profiler = _profiler(item.config)
+    if profiler is not None:
+        report = outcome.get_result()
+        duration = report.duration
+        if report.when == "teardown":
+            # session fixtures are torn down with the last test but charged to the session
+            duration -= item.config.stash[session_teardown_key].pop("seconds", 0.0)
+        profiler.add(report.when, max(duration, 0.0), test=item.nodeid)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_setup(item):
+    _set_stage(item, "setup")
+    yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_call(item):
+    _set_stage(item, "call")
+    yield
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_runtest_teardown(item, nextitem):
+    _set_stage(item, "teardown")
+    yield
+    profiler = _profiler(item.config)
+    session_teardown = item.config.stash.get(session_teardown_key, {})
+    if profiler is not None and "started" in session_teardown:
+        seconds = time.perf_counter() - session_teardown.pop("started")
+        session_teardown["seconds"] = seconds
+        profiler.add("teardown", seconds, test=SESSION_SCOPE)
+
+
+def _set_stage(item, stage):
+    profiler = _profiler(item.config)
+    if profiler is not None:
+        profiler.stage = stage
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_fixture_setup(fixturedef, request):
+    profiler = _profiler(request.config)
+    started = time.perf_counter()
+    yield
+    if profiler is None:
+        return
+    profiler.add_fixture(fixturedef.argname, "setup", time.perf_counter() - started)
+    teardown_started = request.config.stash[teardown_started_key]
+    session_teardown = request.config.stash[session_teardown_key]
+
+    def before_teardown():
+        now = time.perf_counter()
+        teardown_started[id(fixturedef)] = now
+        if fixturedef.scope == "session" and "started" not in session_teardown:
+            # session fixtures go last, so from here on the time (and HTTP) belongs to the session
+            session_teardown["started"] = now
+            profiler.current, profiler.stage = SESSION_SCOPE, None
+
+    # finalizers run last-in first-out, so this one fires right before the fixture's own teardown
+    fixturedef.addfinalizer(before_teardown)
+
+
+def pytest_fixture_post_finalizer(fixturedef, request):
+    profiler = _profiler(request.config)
+    if profiler is None:
+        return
+    started = request.config.stash[teardown_started_key].pop(id(fixturedef), None)
+    if started is not None:
+        profiler.add_fixture(fixturedef.argname, "teardown", time.perf_counter() - started)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def profiler(request, api_client):
+    profiler = _profiler(request.config)
+    if profiler is None:
+        yield None
+        return
+    profiler.install(api_client)
+    yield profiler
+    profiler.uninstall(api_client)
+    report = profiler.format_report()
+    logger.info(f"Profile:\n{report}")
+    allure.attach(report, name="Profile", attachment_type=allure.attachment_type.TEXT)
+    allure.attach(json.dumps(profiler.report(), indent=2), name="Profile (JSON)",
+                  attachment_type=allure.attachment_type.JSON)
+
+
+def pytest_sessionfinish(session):
+    profiler = _profiler(session.config)
+    if profiler is not None and hasattr(session.config, "workeroutput"):
+        # taken after every fixture is torn down; merged on the controller, which writes --profile-json
+        session.config.workeroutput["profile"] = profiler.snapshot()
+        return
+    path = session.config.getoption("profile_json")
+    if profiler is not None and path:
+        with open(path, "w") as report_file:
+            json.dump(profiler.report(top=None), report_file, indent=2)
@@ -0,0 +1,55 @@
+import logging
+import os
+import time
+
+import pytest
+
+from fixtures.cassette import cassette_key
+from fixtures.latency import latency_recorder_key
+from resources import config as api_config
+from resources.trends import TrendStore
+
+
+logger = logging.getLogger(__name__)
+
+session_start_key = pytest.StashKey[float]()
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--trend-db",
+        default=None,
+        help="append this run's per-route latency samples and wall time to the given SQLite trend database",
+    )
+
+
+def pytest_sessionstart(session):
+    session.config.stash[session_start_key] = time.time()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    path = session.config.getoption("trend_db")
+    recorder = session.config.stash.get(latency_recorder_key, None)
+    if not path or recorder is None or hasattr(session.config, "workerinput"):
+        return
+    cassette = session.config.stash.get(cassette_key, None)
+    if cassette is not None and cassette.mode == "replay":
+        # replayed latencies repeat the recorded run; storing them would count that run twice
+        logger.info("Not storing a replayed run in the trend database")
+        return
+    started_at = session.config.stash[session_start_key]
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    store = TrendStore(path)
+    try:
+        run_id = store.record_run(
+            recorder.samples(),
+            wall_time=time.time() - started_at,
+            started_at=started_at,
+            label=os.environ.get("GITHUB_SHA"),
+            base_url=api_config.URL,
+            # the session's status also reflects failures found at session finish, e.g. broken latency SLOs
+            exit_status=int(session.exitstatus),
+        )
+    finally:
+        store.close()
+    logger.info(f"Stored run {run_id} in trend database {path}")
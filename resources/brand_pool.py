@@ -0,0 +1,59 @@
+import logging
+import threading
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from resources import config, scenarios
+
+
+logger = logging.getLogger(__name__)
+
+
+class BrandPool:
+    """Brands created up front and handed out to tests that only need one to exist.
+
+    Each brand is checked out at most once, so a test can rely on nobody else touching it; when the pool
+    runs dry a brand is created on demand. Brands are never returned: the ones left over, like the ones
+    handed out, are removed by the cleanup registry at session end.
+    """
+
+    def __init__(self, client, size, max_workers=None):
+        self.client = client
+        self.size = size
+        self.max_workers = max_workers or config.CLEANUP_WORKERS
+        self._brands = deque()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._brands)
+
+    def fill(self):
+        if self.size <= 0:
+            return
+        logger.info(f"Creating {self.size} pooled brand(s)")
+        # payloads are generated up front so their random values come out in a fixed order
+        payloads = [scenarios.new_brand_payload() for _ in range(self.size)]
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="brand-pool") as executor:
+            brands = list(executor.map(self._create, payloads))
+        with self._lock:
+            self._brands.extend(brand for brand in brands if brand is not None)
+
+    def checkout(self):
+        """Return a copy of an unused brand, so callers may modify the dict freely."""
+        with self._lock:
+            brand = self._brands.popleft() if self._brands else None
+        if brand is None:
+            logger.info("Brand pool is empty, creating a brand on demand")
+            brand = self._create(scenarios.new_brand_payload())
+            if brand is None:
+                raise RuntimeError("Could not create a brand for the pool")
+        return dict(brand)
+
+    def _create(self, payload):
+        response = scenarios.create_brand(self.client, payload)
+        if response.status_code != 201:
+            logger.warning(f"POST /brands returned {response.status_code} while filling the brand pool")
+            return None
+        return response.json()
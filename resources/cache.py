@@ -0,0 +1,88 @@
+import threading
+import time
+
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+import requests
+
+
+# resources whose payloads embed another resource and go stale when it changes
+RELATED_RESOURCES = {
+    "brands": {"products"},
+    "categories": {"products"},
+}
+
+
+class ResponseCache:
+    """LRU cache of successful GET responses with a TTL, invalidated by writes to the same resource.
+
+    Entries are keyed by path, sorted query (from the URL and ``params``) and ``Authorization`` header
+    and grouped by the first path segment after ``base_path`` (``/brands/12`` belongs to ``brands``). A
+    POST/PUT/PATCH/DELETE on a resource drops its entries and those of ``RELATED_RESOURCES``.
+    """
+
+    def __init__(self, base_path="", max_entries=256, ttl=30.0):
+        self.base_path = base_path.rstrip("/")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def resource(self, url):
+        path = urlparse(url).path
+        if self.base_path and path.startswith(self.base_path):
+            path = path[len(self.base_path):]
+        return path.strip("/").split("/", 1)[0]
+
+    def key(self, url, params=None, headers=None):
+        # prepare the URL as requests would send it, so a query in the URL and every form of params count
+        prepared = urlparse(requests.Request("GET", url, params=params).prepare().url)
+        query = urlencode(sorted(parse_qsl(prepared.query, keep_blank_values=True)))
+        authorization = (headers or {}).get("Authorization", "")
+        return self.resource(url), f"{prepared.path}?{query}", authorization
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, response):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, response)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, url):
+        resource = self.resource(url)
+        stale = {resource} | RELATED_RESOURCES.get(resource, set())
+        with self._lock:
+            for key in [key for key in self._entries if key[0] in stale]:
+                del self._entries[key]
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "invalidations": self.invalidations,
+                "entries": len(self._entries),
+            }
@@ -0,0 +1,261 @@
+import base64
+import hashlib
+import json
+import mmap
+import struct
+import threading
+import time
+import zlib
+
+from datetime import timedelta
+from urllib.parse import parse_qsl, urlencode, urlparse
+
+from requests import ConnectionError
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from resources import config
+from resources.helpers import generated_strings
+
+
+MAGIC = b"TSCASS1\n"
+FOOTER = struct.Struct("<Q8s")
+SESSION_SCOPE = "session"
+
+
+class CassetteMiss(ConnectionError):
+    """No recorded exchange matches the request being replayed."""
+
+
+SECRET_FIELDS = ("password",)
+
+
+class Normaliser:
+    """Replaces values from ``generate_random_string`` and secrets with stable placeholders.
+
+    Random values are numbered by the order they were generated in within the current scope, so the
+    same test generates the same placeholders on every run. Values from earlier scopes (e.g. brands a
+    session fixture created during another test's setup) keep placeholders qualified by that scope.
+    Secrets never reach the cassette file.
+    """
+
+    def __init__(self, secrets=()):
+        self.secrets = [secret for secret in secrets if secret]
+        self._earlier = []
+
+    def end_scope(self, scope):
+        tag = _digest(scope, "")[:8]
+        self._earlier.extend(
+            (value, f"{{{{rand:{index}@{tag}}}}}") for index, value in enumerate(generated_strings()) if value
+        )
+
+    def placeholders(self):
+        current = [(value, f"{{{{rand:{index}}}}}") for index, value in enumerate(generated_strings()) if value]
+        # longest first so a value never clobbers a longer one containing it
+        return sorted(current + self._earlier, key=lambda pair: -len(pair[0]))
+
+    def normalise(self, text):
+        for value, placeholder in self.placeholders():
+            text = text.replace(value, placeholder)
+        for secret in self.secrets:
+            text = text.replace(secret, "{{secret}}")
+        return text
+
+    def denormalise(self, text):
+        for value, placeholder in self.placeholders():
+            text = text.replace(placeholder, value)
+        return text
+
+    def request_key(self, request, base_path=""):
+        url = urlparse(request.url)
+        path = url.path[len(base_path):] if base_path and url.path.startswith(base_path) else url.path
+        query = urlencode(sorted(parse_qsl(url.query, keep_blank_values=True)))
+        body = request.body or b""
+        if isinstance(body, bytes):
+            body = body.decode("utf-8", "replace")
+        try:
+            payload = json.loads(body) if body else None
+        except ValueError:
+            payload = None
+        if payload is not None:
+            if isinstance(payload, dict):
+                payload.update({field: "{{secret}}" for field in SECRET_FIELDS if field in payload})
+            body = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return self.normalise(f"{request.method} {path}?{query} {body}")
+
+
+class CassetteWriter:
+    """Appends zlib-compressed exchanges to ``path`` and writes the lookup index on ``close``.
+
+    Layout: ``MAGIC | record* | index | footer`` where the footer holds the index offset, so readers
+    can memory-map the file and decompress only the records they need.
+    """
+
+    def __init__(self, path, meta):
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._index = {"meta": meta, "scoped": {}, "any": {}}
+        self._lock = threading.Lock()
+
+    def add(self, scope, key, exchange):
+        record = zlib.compress(json.dumps(exchange, separators=(",", ":")).encode())
+        with self._lock:
+            location = [self._file.tell(), len(record)]
+            self._file.write(record)
+            self._index["scoped"].setdefault(_digest(scope, key), []).append(location)
+            self._index["any"].setdefault(_digest("", key), location)
+
+    def close(self):
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(zlib.compress(json.dumps(self._index, separators=(",", ":")).encode()))
+            self._file.write(FOOTER.pack(offset, MAGIC))
+            self._file.close()
+
+
+class CassetteReader:
+    """Memory-mapped view of a recording; records are decompressed lazily on lookup."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        offset, magic = FOOTER.unpack(self._map[-FOOTER.size:])
+        if self._map[:len(MAGIC)] != MAGIC or magic != MAGIC:
+            raise ValueError(f"{path} is not a cassette file")
+        index = json.loads(zlib.decompress(self._map[offset:len(self._map) - FOOTER.size]))
+        self.meta = index["meta"]
+        self._scoped = index["scoped"]
+        self._any = index["any"]
+
+    def lookup(self, scope, key, occurrence):
+        locations = self._scoped.get(_digest(scope, key))
+        if locations:
+            location = locations[min(occurrence, len(locations) - 1)]
+        else:
+            location = self._any.get(_digest("", key))
+        if location is None:
+            return None
+        offset, length = location
+        return json.loads(zlib.decompress(self._map[offset:offset + length]))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+
+class Cassette:
+    """Records exchanges to, or replays them from, a cassette file depending on ``mode``."""
+
+    def __init__(self, path, mode, secrets=()):
+        self.mode = mode
+        self.normaliser = Normaliser(secrets)
+        self.scope = SESSION_SCOPE
+        self.base_path = ""
+        self._occurrences = {}
+        self._lock = threading.Lock()
+        if mode == "record":
+            self.meta = {}
+            self.writer, self.reader = CassetteWriter(path, self.meta), None
+        else:
+            self.writer, self.reader = None, CassetteReader(path)
+            self.meta = self.reader.meta
+
+    def begin(self, scope):
+        """Start a new scope; the caller resets generated strings right after."""
+        with self._lock:
+            self.normaliser.end_scope(self.scope)
+            self.scope = scope
+            self._occurrences.clear()
+
+    def _next_occurrence(self, key):
+        with self._lock:
+            occurrence = self._occurrences.get(key, 0)
+            self._occurrences[key] = occurrence + 1
+            return self.scope, occurrence
+
+    def record(self, request, response, elapsed):
+        key = self.normaliser.request_key(request, self.base_path)
+        scope, _ = self._next_occurrence(key)
+        body = response.content or b""
+        try:
+            encoded_body, encoding = self.normaliser.normalise(body.decode("utf-8")), "text"
+        except UnicodeDecodeError:
+            encoded_body, encoding = base64.b64encode(body).decode(), "base64"
+        self.writer.add(scope, key, {
+            "status": response.status_code,
+            "reason": response.reason,
+            "headers": list(response.headers.items()),
+            "body": encoded_body,
+            "encoding": encoding,
+            "elapsed_ms": round(elapsed.total_seconds() * 1000, 3),
+        })
+
+    def replay(self, request):
+        key = self.normaliser.request_key(request, self.base_path)
+        scope, occurrence = self._next_occurrence(key)
+        exchange = self.reader.lookup(scope, key, occurrence)
+        if exchange is None:
+            raise CassetteMiss(f"No recorded response for {key!r} in {scope}", request=request)
+        response = Response()
+        response.status_code = exchange["status"]
+        response.reason = exchange["reason"]
+        response.headers = CaseInsensitiveDict(exchange["headers"])
+        if exchange["encoding"] == "base64":
+            response._content = base64.b64decode(exchange["body"])
+        else:
+            response._content = self.normaliser.denormalise(exchange["body"]).encode("utf-8")
+        response._content_consumed = True
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        if "elapsed_ms" in exchange:
+            # requests overwrites ``elapsed`` after the adapter returns; restore_elapsed puts it back
+            response.recorded_elapsed = timedelta(milliseconds=exchange["elapsed_ms"])
+        return response
+
+    def restore_elapsed(self, response, *args, **kwargs):
+        """Response hook giving a replayed response the time the recorded one took, not the replay's."""
+        recorded = getattr(response, "recorded_elapsed", None)
+        if recorded is not None:
+            response.elapsed = recorded
+
+    def mount(self, client):
+        """Route every request of ``client`` through this cassette."""
+        adapter = CassetteAdapter(
+            self,
+            pool_connections=config.POOL_CONNECTIONS,
+            pool_maxsize=client.pool_maxsize,
+            pool_block=True,
+        )
+        client.mount("http://", adapter)
+        client.mount("https://", adapter)
+        # first, so latency recording and profiling see the recorded time
+        client.hooks["response"].insert(0, self.restore_elapsed)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        if self.reader is not None:
+            self.reader.close()
+
+
+class CassetteAdapter(HTTPAdapter):
+    """Transport adapter that records through the network or replays without touching it."""
+
+    def __init__(self, cassette, **kwargs):
+        super().__init__(**kwargs)
+        self.cassette = cassette
+
+    def send(self, request, **kwargs):
+        if self.cassette.mode == "replay":
+            return self.cassette.replay(request)
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        self.cassette.record(request, response, timedelta(seconds=time.perf_counter() - started))
+        return response
+
+
+def _digest(scope, key):
+    return hashlib.sha1(f"{scope}\n{key}".encode()).hexdigest()
@@ -0,0 +1,88 @@
+import logging
+import re
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from resources import config
+
+
+logger = logging.getLogger(__name__)
+
+BRANDS_PATH = re.compile(r"/brands/?$")
+BRAND_PATH = re.compile(r"/brands/(?P<id>[^/]+)/?$")
+# 422 "The selected id is invalid." means the brand is already gone
+DELETED_STATUSES = (204, 404, 422)
+
+
+class CleanupRegistry:
+    """Collects IDs of brands created during the run and deletes them in bulk at session end.
+
+    ``track`` is installed as a response hook on the API client, so brands created by fixtures and by
+    inline ``POST /brands`` calls are registered alike, and brands a test deletes itself are dropped.
+    """
+
+    def __init__(self, client, max_workers=None, retries=None, backoff=0.5):
+        self.client = client
+        self.max_workers = max_workers or config.CLEANUP_WORKERS
+        self.retries = config.CLEANUP_RETRIES if retries is None else retries
+        self.backoff = backoff
+        self._ids = set()
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        with self._lock:
+            return set(self._ids)
+
+    def register(self, brand_id):
+        with self._lock:
+            self._ids.add(brand_id)
+
+    def discard(self, brand_id):
+        with self._lock:
+            self._ids.discard(brand_id)
+
+    def track(self, response, *args, **kwargs):
+        method = response.request.method
+        path = urlparse(response.request.url).path
+        if method == "POST" and response.status_code == 201 and BRANDS_PATH.search(path):
+            self.register(response.json()["id"])
+        elif method == "DELETE" and response.status_code == 204:
+            match = BRAND_PATH.search(path)
+            if match:
+                self.discard(_as_id(match.group("id")))
+
+    def drain(self, token):
+        """Delete every registered brand and return the IDs that could not be removed."""
+        brand_ids = self.pending
+        if not brand_ids:
+            return []
+        headers = {"Authorization": f"Bearer {token}"}
+        logger.info(f"Deleting {len(brand_ids)} brand(s) created during the run")
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="cleanup") as executor:
+            results = list(executor.map(lambda brand_id: self._delete(brand_id, headers), brand_ids))
+        failed = [brand_id for brand_id, deleted in zip(brand_ids, results) if not deleted]
+        if failed:
+            logger.warning(f"Could not delete brands: {failed}")
+        return failed
+
+    def _delete(self, brand_id, headers):
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.client.delete(f"/brands/{brand_id}", headers=headers)
+                if response.status_code in DELETED_STATUSES:
+                    self.discard(brand_id)
+                    return True
+                logger.info(f"DELETE /brands/{brand_id} returned {response.status_code} (attempt {attempt + 1})")
+            except Exception as error:
+                logger.info(f"DELETE /brands/{brand_id} failed: {error} (attempt {attempt + 1})")
+            if attempt < self.retries:
+                time.sleep(self.backoff * 2 ** attempt)
+        return False
+
+
+def _as_id(value):
+    return int(value) if value.isdigit() else value
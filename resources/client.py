@@ -0,0 +1,68 @@
+import requests
+
+from requests.adapters import HTTPAdapter
+
+from resources import config
+from resources.scheduler import ScheduledAdapter
+
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+
+class ApiClient(requests.Session):
+    """Pooled keep-alive session bound to the API base URL.
+
+    Relative paths such as ``/brands`` are resolved against ``base_url`` and every request gets the
+    default ``(connect, read)`` timeout unless the caller passes its own. With a ``ResponseCache``
+    attached, GETs are served from it unless called with ``use_cache=False``, and writes invalidate it.
+    With a ``RequestScheduler`` attached, every request is rate limited, concurrency limited and retried
+    by it.
+    """
+
+    def __init__(self, base_url=None, pool_connections=None, pool_maxsize=None, timeout=None, cache=None,
+                 scheduler=None):
+        super().__init__()
+        self.base_url = (base_url or config.URL or "").rstrip("/")
+        self.timeout = timeout or (config.CONNECT_TIMEOUT, config.READ_TIMEOUT)
+        self.cache = cache
+        self.scheduler = scheduler
+        self.pool_maxsize = pool_maxsize or config.POOL_MAXSIZE
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections or config.POOL_CONNECTIONS,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=True,
+        )
+        self.mount("http://", adapter)
+        self.mount("https://", adapter)
+
+    def get_adapter(self, url):
+        adapter = super().get_adapter(url)
+        if self.scheduler is None:
+            return adapter
+        # scheduling wraps the transport, so hooks only see the final response of a retried request
+        return ScheduledAdapter(adapter, self.scheduler)
+
+    def url_for(self, path):
+        if path.startswith(("http://", "https://")):
+            return path
+        return f"{self.base_url}/{path.lstrip('/')}"
+
+    def request(self, method, url, *args, use_cache=True, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        url = self.url_for(url)
+        method = method.upper()
+        if self.cache is None or (method in SAFE_METHODS and not (method == "GET" and use_cache)):
+            return super().request(method, url, *args, **kwargs)
+        if method == "GET":
+            key = self.cache.key(url, kwargs.get("params"), kwargs.get("headers"))
+            response = self.cache.get(key)
+            if response is None:
+                response = super().request(method, url, *args, **kwargs)
+                if response.status_code == 200:
+                    self.cache.put(key, response)
+            return response
+        # invalidate on both sides so concurrent readers cannot re-cache the state before the write
+        self.cache.invalidate(url)
+        response = super().request(method, url, *args, **kwargs)
+        self.cache.invalidate(url)
+        return response
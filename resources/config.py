@@ -9,3 +9,24 @@ ADMIN = os.environ.get("ADMIN")
 USER1 = os.environ.get("USER1")
 USER2 = os.environ.get("USER2")
 PASSWORD = os.environ.get("PASSWORD")
+
+# HTTP client tuning
+POOL_CONNECTIONS = int(os.environ.get("POOL_CONNECTIONS", 4))
+POOL_MAXSIZE = int(os.environ.get("POOL_MAXSIZE", 16))
+CONNECT_TIMEOUT = float(os.environ.get("CONNECT_TIMEOUT", 5))
+READ_TIMEOUT = float(os.environ.get("READ_TIMEOUT", 5))
+
+# Token cache: refresh tokens this many seconds before their JWT expiry
+TOKEN_REFRESH_MARGIN = float(os.environ.get("TOKEN_REFRESH_MARGIN", 30))
+
+# Deferred brand cleanup
+CLEANUP_WORKERS = int(os.environ.get("CLEANUP_WORKERS", 8))
+CLEANUP_RETRIES = int(os.environ.get("CLEANUP_RETRIES", 3))
+
+# Request scheduler: token buckets in requests/s per host and per route (0 disables), retries of
+# throttled and transient failures, and the latency in ms above which concurrency is reduced
+RATE_LIMIT = float(os.environ.get("RATE_LIMIT", 0))
+ROUTE_RATE_LIMIT = float(os.environ.get("ROUTE_RATE_LIMIT", 0))
+MAX_RETRIES = int(os.environ.get("MAX_RETRIES", 3))
+RETRY_BACKOFF = float(os.environ.get("RETRY_BACKOFF", 0.2))
+LATENCY_TARGET = float(os.environ.get("LATENCY_TARGET", 2000))
@@ -0,0 +1,148 @@
+"""Contention benchmark for the brand uniqueness checks.
+
+Fires N simultaneous requests that compete for the same slug (POST /brands) or the same name and slug
+(PUT /brands/{id}), measures throughput and tail latency, and verifies that exactly one request wins.
+
+Usage::
+
+    python -m resources.contention --requests 50 --rounds 5
+"""
+import argparse
+import sys
+import threading
+import time
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from resources import config, scenarios
+from resources.cleanup import CleanupRegistry
+from resources.client import ApiClient
+from resources.helpers import generate_random_string
+from resources.latency import percentile
+from resources.token_cache import TokenCache
+
+
+SLUG_TAKEN = "A brand already exists with this slug."
+DUPLICATE_ENTRY = "Duplicate Entry"
+
+
+class ContentionResult:
+    def __init__(self, responses, latencies, wall_time):
+        self.responses = responses
+        self.latencies = sorted(latencies)
+        self.wall_time = wall_time
+
+    @property
+    def statuses(self):
+        return Counter(response.status_code for response in self.responses)
+
+    @property
+    def throughput(self):
+        return len(self.responses) / self.wall_time if self.wall_time else 0.0
+
+    def stats(self):
+        return {
+            "requests": len(self.responses),
+            "throughput": self.throughput,
+            "p50": percentile(self.latencies, 50),
+            "p95": percentile(self.latencies, 95),
+            "p99": percentile(self.latencies, 99),
+            "max": self.latencies[-1] if self.latencies else None,
+        }
+
+    def single_winner_violations(self, success_status, message_of, expected_message):
+        """Describe every way the round deviates from one ``success_status`` and 422 ``expected_message``s."""
+        violations = []
+        winners = self.statuses.get(success_status, 0)
+        if winners != 1:
+            violations.append(f"expected exactly one {success_status}, got {winners}")
+        for response in self.responses:
+            if response.status_code == success_status:
+                continue
+            if response.status_code != 422:
+                violations.append(f"unexpected status {response.status_code}: {response.text[:200]}")
+            elif message_of(response.json()) != expected_message:
+                violations.append(f"unexpected 422 body: {response.text[:200]}")
+        return violations
+
+
+def fire_together(calls):
+    """Run the zero-argument ``calls`` on one thread each, released at the same instant by a barrier."""
+    barrier = threading.Barrier(len(calls))
+    latencies = []
+
+    def run(call):
+        barrier.wait()
+        started = time.perf_counter()
+        response = call()
+        latencies.append((time.perf_counter() - started) * 1000)
+        return response
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=len(calls), thread_name_prefix="contender") as executor:
+        responses = list(executor.map(run, calls))
+    return ContentionResult(responses, latencies, time.perf_counter() - started)
+
+
+def contend_post_same_slug(client, requests):
+    """POST ``requests`` brands with distinct names and one shared slug."""
+    slug = f"new-brand-{generate_random_string(8)}"
+    payloads = [{"name": f"new brand {generate_random_string(8)}", "slug": slug} for _ in range(requests)]
+    result = fire_together([lambda payload=payload: scenarios.create_brand(client, payload) for payload in payloads])
+    violations = result.single_winner_violations(201, lambda body: (body.get("slug") or [None])[0], SLUG_TAKEN)
+    return result, violations
+
+
+def contend_put_same_name(client, requests):
+    """Create ``requests`` brands, then PUT all of them to one unused name and slug at once."""
+    brand_ids = [scenarios.create_brand(client, scenarios.new_brand_payload()).json()["id"] for _ in range(requests)]
+    payload = scenarios.new_brand_payload()
+    result = fire_together([
+        lambda brand_id=brand_id: scenarios.update_brand(client, brand_id, payload) for brand_id in brand_ids
+    ])
+    violations = result.single_winner_violations(200, lambda body: body.get("message"), DUPLICATE_ENTRY)
+    return result, violations
+
+
+BENCHMARKS = {
+    "post-same-slug": contend_post_same_slug,
+    "put-same-name": contend_put_same_name,
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m resources.contention", description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20, help="concurrent requests per round")
+    parser.add_argument("--rounds", type=int, default=3, help="rounds per benchmark")
+    parser.add_argument("--benchmark", choices=sorted(BENCHMARKS), action="append",
+                        help="benchmark to run, repeatable (default: all)")
+    parser.add_argument("--url", default=None, help="API base URL (default: URL from the environment)")
+    args = parser.parse_args(argv)
+
+    client = ApiClient(base_url=args.url, pool_maxsize=max(args.requests, config.POOL_MAXSIZE))
+    cleanup = CleanupRegistry(client)
+    client.hooks["response"].append(cleanup.track)
+    failed = False
+    try:
+        for name in args.benchmark or sorted(BENCHMARKS):
+            for round_number in range(1, args.rounds + 1):
+                result, violations = BENCHMARKS[name](client, args.requests)
+                stats = result.stats()
+                print(
+                    f"{name} round {round_number}: {stats['requests']} requests {stats['throughput']:.1f} req/s "
+                    f"p50={stats['p50']:.1f}ms p95={stats['p95']:.1f}ms p99={stats['p99']:.1f}ms "
+                    f"max={stats['max']:.1f}ms statuses={dict(result.statuses)}"
+                )
+                for violation in violations:
+                    print(f"  VIOLATION {violation}")
+                failed = failed or bool(violations)
+    finally:
+        if cleanup.pending:
+            cleanup.drain(TokenCache(client).get(config.ADMIN))
+        client.close()
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,333 @@
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import re
+import secrets
+import threading
+import time
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+logger = logging.getLogger(__name__)
+
+TOKEN_TTL = 300
+PER_PAGE = 9
+MAX_LENGTH = 120
+JSON = "application/json"
+JSON_UTF8 = "application/json;charset=UTF-8"
+
+SEED_BRANDS = [
+    {"id": 1, "name": "ForgeFlex Tools", "slug": "forgeflex-tools"},
+    {"id": 2, "name": "MightyCraft Hardware", "slug": "mightycraft-hardware"},
+]
+SEED_CATEGORIES = [
+    {"id": 1, "parent_id": None, "name": "Hand Tools", "slug": "hand-tools"},
+    {"id": 2, "parent_id": None, "name": "Power Tools", "slug": "power-tools"},
+    {"id": 3, "parent_id": 1, "name": "Hammer", "slug": "hammer"},
+    {"id": 4, "parent_id": 1, "name": "Pliers", "slug": "pliers"},
+    {"id": 5, "parent_id": 1, "name": "Wrench", "slug": "wrench"},
+    {"id": 6, "parent_id": 2, "name": "Drill", "slug": "drill"},
+    {"id": 7, "parent_id": 2, "name": "Sander", "slug": "sander"},
+]
+SEED_PRODUCT_NAMES = [
+    "Adjustable Wrench", "Angled Spanner", "Belt Sander", "Bolt Cutters", "Chisels Set", "Claw Hammer",
+    "Claw Hammer with Shock Reduction Grip", "Combination Pliers", "Cordless Drill 12V", "Cordless Drill 18V",
+    "Court Hammer", "Cross-head screws", "Drawer Tool Cabinet", "Excavator", "Film", "Fixed Wrench",
+    "Hammer", "Leather toolbelt", "Long Nose Pliers", "Open-end Spanners (Set)", "Pliers", "Random Orbit Sander",
+    "Sheet Sander", "Slip Joint Pliers", "Thor Hammer", "Wood Saw", "Workbench with Drawers", "Circular Saw",
+]
+
+
+class FakeToolshopServer(ThreadingHTTPServer):
+    """In-process stand-in for the Toolshop API used by the suite.
+
+    Implements the ``/brands``, ``/products`` and ``/users/login`` endpoints with the validation messages,
+    status codes and headers the tests assert on. ``accounts`` maps e-mail to role (``admin`` or ``user``).
+    """
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def __init__(self, accounts, password, host="127.0.0.1", port=0):
+        super().__init__((host, port), ToolshopRequestHandler)
+        self.accounts = dict(accounts)
+        self.password = password
+        self.secret = secrets.token_bytes(32)
+        self.lock = threading.Lock()
+        self.brands = {brand["id"]: dict(brand) for brand in SEED_BRANDS}
+        self.next_brand_id = max(self.brands) + 1
+        self.categories = {category["id"]: dict(category) for category in SEED_CATEGORIES}
+        self.products = [self._seed_product(index, name) for index, name in enumerate(SEED_PRODUCT_NAMES, start=1)]
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-toolshop", daemon=True)
+        self._thread.start()
+        logger.info(f"Fake Toolshop API listening on {self.url}")
+        return self
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def issue_token(self, email):
+        now = int(time.time())
+        claims = {"sub": email, "role": self.accounts[email], "iat": now, "exp": now + TOKEN_TTL}
+        header = _b64({"alg": "HS256", "typ": "JWT"})
+        payload = _b64(claims)
+        return f"{header}.{payload}.{self._sign(f'{header}.{payload}')}"
+
+    def verify_token(self, token):
+        """Return the claims of a valid, unexpired token, otherwise ``None``."""
+        try:
+            header, payload, signature = token.split(".")
+            if not hmac.compare_digest(signature, self._sign(f"{header}.{payload}")):
+                return None
+            claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        except ValueError:
+            return None
+        return claims if claims["exp"] > time.time() else None
+
+    def _sign(self, message):
+        digest = hmac.new(self.secret, message.encode(), hashlib.sha256).digest()
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+    def _seed_product(self, index, name):
+        brand = self.brands[1 + index % len(SEED_BRANDS)]
+        category = self.categories[3 + index % (len(SEED_CATEGORIES) - 2)]
+        image = {
+            "id": index,
+            "by_name": "Helinton Fantin",
+            "by_url": "https://unsplash.com/@fantin",
+            "source_name": "Unsplash",
+            "source_url": "https://unsplash.com/photos/W8BNwvOvW4M",
+            "file_name": f"product{index:02d}.avif",
+            "title": name,
+        }
+        return {
+            "id": index,
+            "name": name,
+            "description": f"{name} for professional and home use.",
+            "stock": index % 7,
+            "price": round(4.99 + index * 1.37, 2),
+            "is_location_offer": index % 2,
+            "is_rental": 0,
+            "brand_id": brand["id"],
+            "category_id": category["id"],
+            "product_image_id": image["id"],
+            "product_image": image,
+            "category": dict(category),
+            "brand": dict(brand),
+        }
+
+
+class ToolshopRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body are written separately; without TCP_NODELAY the body waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    routes = [
+        ("POST", re.compile(r"/users/login"), "login"),
+        ("GET", re.compile(r"/brands"), "list_brands"),
+        ("POST", re.compile(r"/brands"), "create_brand"),
+        ("GET", re.compile(r"/brands/search"), "search_brands"),
+        ("GET", re.compile(r"/brands/(?P<brand_id>\d+)"), "get_brand"),
+        ("PUT", re.compile(r"/brands/(?P<brand_id>\d+)"), "update_brand"),
+        ("DELETE", re.compile(r"/brands/(?P<brand_id>\d+)"), "delete_brand"),
+        ("GET", re.compile(r"/products"), "list_products"),
+        ("GET", re.compile(r"/products/(?P<product_id>\d+)"), "get_product"),
+    ]
+
+    def do_GET(self):
+        self._dispatch()
+
+    def do_POST(self):
+        self._dispatch()
+
+    def do_PUT(self):
+        self._dispatch()
+
+    def do_DELETE(self):
+        self._dispatch()
+
+    def send_response(self, code, message=None):
+        # no Server header: the real API does not leak server information
+        self.log_request(code)
+        self.send_response_only(code, message)
+        self.send_header("Date", self.date_time_string())
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+    # endpoints
+
+    def login(self):
+        body = self.json_body
+        email = body.get("email")
+        if email not in self.server.accounts or body.get("password") != self.server.password:
+            return self.respond(401, {"error": "Unauthorized"})
+        token = self.server.issue_token(email)
+        return self.respond(200, {"access_token": token, "token_type": "bearer", "expires_in": TOKEN_TTL})
+
+    def list_brands(self):
+        with self.server.lock:
+            brands = [dict(brand) for brand in self.server.brands.values()]
+        return self.respond(200, brands)
+
+    def search_brands(self):
+        query = self.query.get("q", [""])[0].lower()
+        with self.server.lock:
+            brands = [dict(brand) for brand in self.server.brands.values() if query in brand["name"].lower()]
+        return self.respond(200, brands)
+
+    def get_brand(self, brand_id):
+        with self.server.lock:
+            brand = self.server.brands.get(int(brand_id))
+        if brand is None:
+            return self.respond(404, {"message": "Requested item not found"})
+        return self.respond(200, dict(brand))
+
+    def create_brand(self):
+        body = self.json_body
+        with self.server.lock:
+            errors = validate_brand(body)
+            for field in ("name", "slug"):
+                if field not in errors and any(b[field] == body[field] for b in self.server.brands.values()):
+                    errors[field] = [f"A brand already exists with this {field}."]
+            if errors:
+                return self.respond(422, errors)
+            brand = {"id": self.server.next_brand_id, "name": body["name"], "slug": body["slug"]}
+            self.server.brands[brand["id"]] = brand
+            self.server.next_brand_id += 1
+        return self.respond(201, dict(brand))
+
+    def update_brand(self, brand_id):
+        body = self.json_body
+        errors = validate_brand(body)
+        if errors:
+            return self.respond(422, errors)
+        with self.server.lock:
+            brand = self.server.brands.get(int(brand_id))
+            if brand is None:
+                return self.respond(404, {"message": "Requested item not found"})
+            others = [b for b in self.server.brands.values() if b is not brand]
+            if any(b["name"] == body["name"] or b["slug"] == body["slug"] for b in others):
+                return self.respond(422, {"message": "Duplicate Entry"})
+            brand.update(name=body["name"], slug=body["slug"])
+        return self.respond(200, {"success": True})
+
+    def delete_brand(self, brand_id):
+        claims = self.bearer_claims
+        if claims is None or claims["role"] != "admin":
+            return self.respond(401, {"message": "Unauthorized"})
+        with self.server.lock:
+            if int(brand_id) not in self.server.brands:
+                return self.respond(422, {"id": ["The selected id is invalid."]})
+            if any(product["brand_id"] == int(brand_id) for product in self.server.products):
+                return self.respond(409, {"message": "Seems like this brand is being used by products."})
+            del self.server.brands[int(brand_id)]
+        return self.respond(204)
+
+    def list_products(self):
+        products = self.server.products
+        field, _, direction = self.query.get("sort", ["id,asc"])[0].partition(",")
+        if field in ("name", "price"):
+            products = sorted(products, key=lambda product: product[field], reverse=direction == "desc")
+        try:
+            page = max(int(self.query.get("page", ["1"])[0]), 1)
+        except ValueError:
+            page = 1
+        total = len(products)
+        last_page = max((total + PER_PAGE - 1) // PER_PAGE, 1)
+        start = (page - 1) * PER_PAGE
+        data = products[start:start + PER_PAGE]
+        return self.respond(200, {
+            "current_page": page,
+            "data": data,
+            "from": start + 1 if data else None,
+            "last_page": last_page,
+            "per_page": PER_PAGE,
+            "to": start + len(data) if data else None,
+            "total": total,
+        })
+
+    def get_product(self, product_id):
+        for product in self.server.products:
+            if product["id"] == int(product_id):
+                return self.respond(200, product)
+        return self.respond(404, {"message": "Requested item not found"})
+
+    # plumbing
+
+    def _dispatch(self):
+        parsed = urlparse(self.path)
+        self.query = parse_qs(parsed.query)
+        path = parsed.path.rstrip("/") or "/"
+        self._read_body()
+        path_matched = False
+        for method, pattern, endpoint in self.routes:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            path_matched = True
+            if method == self.command:
+                return getattr(self, endpoint)(**match.groupdict())
+        if path_matched:
+            return self.respond(405, {"message": "Method is not allowed for the requested route"})
+        return self.respond(404, {"message": "Resource not found"})
+
+    def _read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            body = {}
+        self.json_body = body if isinstance(body, dict) else {}
+
+    @property
+    def bearer_claims(self):
+        scheme, _, token = (self.headers.get("Authorization") or "").partition(" ")
+        if scheme != "Bearer" or not token:
+            return None
+        return self.server.verify_token(token)
+
+    def respond(self, status, payload=None):
+        body = b"" if payload is None else json.dumps(payload).encode()
+        self.send_response(status)
+        if payload is not None:
+            self.send_header("Content-Type", JSON_UTF8 if status < 300 else JSON)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-cache, private")
+        self.send_header("Access-Control-Allow-Origin", "*")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def validate_brand(body):
+    """Apply the ``required|string|max:120`` rules of the brand form request."""
+    errors = {}
+    for field in ("name", "slug"):
+        value = body.get(field)
+        if value is None or value in ([], {}) or (isinstance(value, str) and not value.strip()):
+            errors[field] = [f"The {field} field is required."]
+        elif not isinstance(value, str):
+            errors[field] = [f"The {field} must be a string."]
+        elif len(value) > MAX_LENGTH:
+            errors[field] = [f"The {field} may not be greater than {MAX_LENGTH} characters."]
+    return errors
+
+
+def _b64(claims):
+    return base64.urlsafe_b64encode(json.dumps(claims).encode()).rstrip(b"=").decode()
@@ -0,0 +1,278 @@
+"""Property-based fuzzing of the POST /brands validation rules.
+
+Every generated payload breaks at least one of the ``required|string|max:120`` rules on ``name`` or
+``slug``, so the API must answer with a well-formed 422 naming exactly the broken fields, within the
+latency budget. Failing payloads are shrunk to a minimal reproducer.
+
+Usage::
+
+    python -m resources.fuzz --examples 5000 --workers 16 --seed 1
+"""
+import argparse
+import json
+import random
+import string
+import sys
+import time
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from resources import config, scenarios
+from resources.cleanup import CleanupRegistry
+from resources.client import ApiClient
+from resources.latency import percentile
+from resources.schemas import ValidationErrors
+from resources.token_cache import TokenCache
+
+
+MAX_LENGTH = 120
+FIELDS = ("name", "slug")
+MISSING = object()
+# PHP's trim() only strips these, so only they make a string blank
+BLANKS = " \t\n\r\x0b"
+UNICODE = "ąćęłńóśźżßøåéèüöçñ漢字テスト한국어Ωπλ✓★☃😀🚀"
+EXTRA_FIELDS = ("id", "description", "brand_id", "extra", "__proto__")
+# check_response reason prefixes and the failure category they belong to
+REASON_KINDS = (
+    ("took ", "latency"),
+    ("status ", "status"),
+    ("content-type ", "content-type"),
+    ("body is not JSON", "body"),
+    ("error fields ", "error fields"),
+)
+
+
+def expected_error(field, value):
+    """The message the API must return for ``value`` in ``field``, or ``None`` if the value is valid."""
+    # Laravel's ``required`` also rejects empty arrays, and JSON objects decode to arrays in PHP
+    if value is MISSING or value is None or value in ([], {}) or (isinstance(value, str) and not value.strip(BLANKS)):
+        return f"The {field} field is required."
+    if not isinstance(value, str):
+        return f"The {field} must be a string."
+    if len(value) > MAX_LENGTH:
+        return f"The {field} may not be greater than {MAX_LENGTH} characters."
+    return None
+
+
+def expected_errors(payload):
+    return {
+        field: message
+        for field in FIELDS
+        if (message := expected_error(field, payload.get(field, MISSING))) is not None
+    }
+
+
+class PayloadGenerator:
+    """Random payloads mixing valid and invalid values, with at least one invalid field each."""
+
+    def __init__(self, seed=None):
+        self.random = random.Random(seed)
+
+    def text(self, length, alphabet=string.ascii_letters):
+        return "".join(self.random.choice(alphabet) for _ in range(length))
+
+    def valid_value(self):
+        kind = self.random.choice(("ascii", "unicode", "boundary"))
+        if kind == "unicode":
+            return self.text(self.random.randint(1, MAX_LENGTH), UNICODE)
+        if kind == "boundary":
+            return self.text(self.random.choice((MAX_LENGTH - 1, MAX_LENGTH)))
+        return self.text(self.random.randint(8, 40))
+
+    def invalid_value(self):
+        kind = self.random.choice(
+            ("missing", "null", "empty", "blank", "long", "long_unicode", "int", "float", "bool", "list", "dict")
+        )
+        return {
+            "missing": lambda: MISSING,
+            "null": lambda: None,
+            "empty": lambda: "",
+            "blank": lambda: self.text(self.random.randint(1, 5), BLANKS),
+            "long": lambda: self.text(self.random.choice((MAX_LENGTH + 1, MAX_LENGTH + 2, 200, 1000))),
+            "long_unicode": lambda: self.text(MAX_LENGTH + self.random.randint(1, 10), UNICODE),
+            "int": lambda: self.random.randint(-2 ** 31, 2 ** 31),
+            "float": lambda: self.random.uniform(-1e6, 1e6),
+            "bool": lambda: self.random.choice((True, False)),
+            "list": lambda: [self.text(8)],
+            "dict": lambda: {self.text(8): 0},
+        }[kind]()
+
+    def payload(self):
+        invalid = {field for field in FIELDS if self.random.random() < 0.6} or {self.random.choice(FIELDS)}
+        payload = {}
+        for field in FIELDS:
+            value = self.invalid_value() if field in invalid else self.valid_value()
+            if value is not MISSING:
+                payload[field] = value
+        if self.random.random() < 0.2:
+            payload[self.random.choice(EXTRA_FIELDS)] = self.text(6)
+        return payload
+
+
+def check_response(payload, response, budget_ms):
+    """Return the reasons ``response`` is not a well-formed 422 for ``payload`` (empty when it is)."""
+    reasons = []
+    elapsed = response.elapsed.total_seconds() * 1000
+    if elapsed > budget_ms:
+        reasons.append(f"took {elapsed:.0f} ms (budget {budget_ms:.0f} ms)")
+    if response.status_code != 422:
+        return reasons + [f"status {response.status_code}"]
+    if not response.headers.get("content-type", "").startswith("application/json"):
+        reasons.append(f"content-type {response.headers.get('content-type')!r}")
+    try:
+        body = response.json()
+    except ValueError:
+        return reasons + ["body is not JSON"]
+    violations = ValidationErrors.validate(body)
+    if violations:
+        return reasons + violations
+    expected = expected_errors(payload)
+    if set(body) != set(expected):
+        reasons.append(f"error fields {sorted(body)} != {sorted(expected)}")
+    for field, message in expected.items():
+        if body.get(field) and body[field][0] != message:
+            reasons.append(f"{field}: {body[field][0]!r} != {message!r}")
+    return reasons
+
+
+def failure_kinds(reasons):
+    """The categories of ``check_response`` reasons, used to keep shrinking on the original failure."""
+    kinds = set()
+    for reason in reasons:
+        field = reason.split(":", 1)[0]
+        kind = next((kind for prefix, kind in REASON_KINDS if reason.startswith(prefix)), None)
+        kinds.add(kind or (f"message {field}" if field in FIELDS else "schema"))
+    # latency is noisy, so it only defines the failure when nothing else went wrong
+    return kinds - {"latency"} or kinds
+
+
+def shrink_candidates(payload):
+    """Simpler variants of ``payload`` that still break at least one rule, simplest first."""
+    for key in payload:
+        if key not in FIELDS:
+            yield {k: v for k, v in payload.items() if k != key}
+    for field in FIELDS:
+        value = payload.get(field, MISSING)
+        replacements = []
+        if isinstance(value, str):
+            if any(char not in string.ascii_letters for char in value.strip(BLANKS)):
+                replacements.append("a" * len(value))
+            if expected_error(field, value) is None:
+                replacements.append("a")
+            elif len(value) > MAX_LENGTH + 1:
+                replacements += [value[:MAX_LENGTH + 1], value[:(len(value) + MAX_LENGTH + 1) // 2]]
+        elif isinstance(value, (list, dict)) and value:
+            replacements.append(type(value)())
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and value != 0:
+            replacements.append(0)
+        for replacement in replacements:
+            yield {**payload, field: replacement}
+
+
+def shrink(payload, still_fails, max_attempts=100):
+    """Greedily apply ``shrink_candidates`` while ``still_fails`` holds; returns the smallest payload found.
+
+    ``still_fails`` should only accept a candidate failing the same way as ``payload`` (see
+    ``failure_kinds``), or the result may reproduce a different problem.
+    """
+    attempts = 0
+    improved = True
+    while improved and attempts < max_attempts:
+        improved = False
+        for candidate in shrink_candidates(payload):
+            if not expected_errors(candidate):
+                continue
+            attempts += 1
+            if still_fails(candidate):
+                payload, improved = candidate, True
+                break
+            if attempts >= max_attempts:
+                break
+    return payload
+
+
+class FuzzReport:
+    def __init__(self):
+        self.sent = 0
+        self.latencies = []
+        self.failures = []
+        self.wall_time = 0.0
+
+    @property
+    def throughput(self):
+        return self.sent / self.wall_time if self.wall_time else 0.0
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        return (
+            f"{self.sent} payloads, {len(self.failures)} failures, {self.throughput:.1f} req/s, "
+            + " ".join(f"p{pct}={percentile(latencies, pct):.1f}ms" for pct in (50, 95, 99) if latencies)
+        )
+
+
+def fuzz_brands(client, examples, workers=8, budget_ms=800, seed=None, max_shrunk=5):
+    """Send ``examples`` invalid payloads through ``workers`` threads and shrink the first failures."""
+    generator = PayloadGenerator(seed)
+    report = FuzzReport()
+
+    def send(payload):
+        response = scenarios.create_brand(client, payload)
+        return payload, response, check_response(payload, response, budget_ms)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="fuzz") as executor:
+        in_flight = deque()
+        for _ in range(examples):
+            in_flight.append(executor.submit(send, generator.payload()))
+            if len(in_flight) >= workers * 2:
+                _collect(in_flight.popleft().result(), report)
+        while in_flight:
+            _collect(in_flight.popleft().result(), report)
+    report.wall_time = time.perf_counter() - started
+    for failure in report.failures[:max_shrunk]:
+        kinds = failure_kinds(failure["reasons"])
+        failure["minimal"] = shrink(failure["payload"], lambda candidate: failure_kinds(send(candidate)[2]) == kinds)
+    return report
+
+
+def _collect(result, report):
+    payload, response, reasons = result
+    report.sent += 1
+    report.latencies.append(response.elapsed.total_seconds() * 1000)
+    if reasons:
+        report.failures.append({"payload": payload, "status": response.status_code, "reasons": reasons})
+
+
+def describe(failure):
+    payload = json.dumps(failure.get("minimal", failure["payload"]), ensure_ascii=False)
+    return f"{payload[:300]} -> status {failure['status']}: {'; '.join(failure['reasons'])}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m resources.fuzz", description=__doc__.splitlines()[0])
+    parser.add_argument("--examples", type=int, default=1000, help="number of payloads to send")
+    parser.add_argument("--workers", type=int, default=8, help="concurrent requests in flight")
+    parser.add_argument("--budget", type=float, default=800, help="latency budget per request in milliseconds")
+    parser.add_argument("--seed", type=int, default=None, help="seed for reproducible payloads")
+    parser.add_argument("--url", default=None, help="API base URL (default: URL from the environment)")
+    args = parser.parse_args(argv)
+
+    client = ApiClient(base_url=args.url, pool_maxsize=max(args.workers, config.POOL_MAXSIZE))
+    cleanup = CleanupRegistry(client)
+    client.hooks["response"].append(cleanup.track)
+    try:
+        report = fuzz_brands(client, args.examples, workers=args.workers, budget_ms=args.budget, seed=args.seed)
+    finally:
+        # a payload the API wrongly accepted leaves a brand behind
+        if cleanup.pending:
+            cleanup.drain(TokenCache(client).get(config.ADMIN))
+        client.close()
+    print(report.summary())
+    for failure in report.failures[:5]:
+        print(f"  FAILURE {describe(failure)}")
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,49 @@
+import os
 import random
 import string
 
+from collections import deque
+
+
+# most recent values handed out, so recordings can recognise and normalise them
+_generated = deque(maxlen=256)
+
+
+def _worker_prefix():
+    """Fixed-width letters identifying the pytest-xdist worker, empty outside a distributed run.
+
+    Every value generated by a worker starts with its own prefix, so workers can never produce the same
+    string (and hence the same brand name or slug).
+    """
+    worker = os.environ.get("PYTEST_XDIST_WORKER", "")
+    if not worker.startswith("gw"):
+        return ""
+    letters = string.ascii_letters
+    index, count = int(worker[2:]), int(os.environ.get("PYTEST_XDIST_WORKER_COUNT", 1))
+    width = 1
+    while len(letters) ** width < count:
+        width += 1
+    prefix = ""
+    for _ in range(width):
+        index, remainder = divmod(index, len(letters))
+        prefix = letters[remainder] + prefix
+    return prefix
+
+
+_prefix = _worker_prefix()
+
 
 def generate_random_string(length):
     letters = string.ascii_letters
-    return ''.join(random.choice(letters) for _ in range(length))
+    prefix = _prefix if length > len(_prefix) else ""
+    value = prefix + ''.join(random.choice(letters) for _ in range(length - len(prefix)))
+    _generated.append(value)
+    return value
+
+
+def generated_strings():
+    return list(_generated)
+
+
+def reset_generated_strings():
+    _generated.clear()
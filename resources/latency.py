@@ -0,0 +1,108 @@
+import math
+import re
+import threading
+
+from collections import defaultdict
+from urllib.parse import urlparse
+
+
+# numeric IDs and ULIDs are collapsed into ``{id}`` so samples aggregate per route
+ID_SEGMENT = re.compile(r"\d+|[0-9A-HJKMNP-TV-Z]{26}", re.IGNORECASE)
+PERCENTILES = (50, 95, 99)
+DEFAULT_ROUTE = "*"
+
+
+def route_template(method, url, base_path=""):
+    path = urlparse(url).path
+    if base_path and path.startswith(base_path):
+        path = path[len(base_path):]
+    segments = ["{id}" if ID_SEGMENT.fullmatch(segment) else segment for segment in path.strip("/").split("/")]
+    return f"{method} /{'/'.join(segments)}"
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not samples:
+        return None
+    rank = max(math.ceil(pct / 100 * len(samples)), 1)
+    return samples[rank - 1]
+
+
+def parse_slos(lines):
+    """Parse ``<METHOD> <route> p95=800 max=2000`` lines (milliseconds) into ``{route: {stat: limit}}``.
+
+    A route of ``*`` sets the default applied to every route without its own entry.
+    """
+    slos = {}
+    for line in lines:
+        tokens = line.split()
+        limits = {}
+        while tokens and "=" in tokens[-1]:
+            stat, _, limit = tokens.pop().partition("=")
+            limits[stat] = float(limit)
+        if tokens and limits:
+            slos.setdefault(" ".join(tokens), {}).update(limits)
+    return slos
+
+
+class LatencyRecorder:
+    """Collects the elapsed time of every response, keyed by method and route template.
+
+    ``hook`` is installed as a response hook on the API client. Times are kept in milliseconds.
+    """
+
+    def __init__(self, base_path="", slos=None):
+        self.base_path = base_path.rstrip("/")
+        self.slos = slos or {}
+        self._samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def record(self, route, milliseconds):
+        with self._lock:
+            self._samples[route].append(milliseconds)
+
+    def merge(self, samples):
+        """Add samples collected elsewhere, e.g. by a pytest-xdist worker."""
+        with self._lock:
+            for route, route_samples in samples.items():
+                self._samples[route].extend(route_samples)
+
+    def hook(self, response, *args, **kwargs):
+        route = route_template(response.request.method, response.request.url, self.base_path)
+        self.record(route, response.elapsed.total_seconds() * 1000)
+
+    def samples(self):
+        with self._lock:
+            return {route: list(samples) for route, samples in self._samples.items()}
+
+    def summary(self):
+        summary = {}
+        for route, samples in sorted(self.samples().items()):
+            samples.sort()
+            stats = {"count": len(samples)}
+            stats.update({f"p{pct}": percentile(samples, pct) for pct in PERCENTILES})
+            stats["max"] = samples[-1]
+            summary[route] = stats
+        return summary
+
+    def slo_for(self, route):
+        return self.slos.get(route, self.slos.get(DEFAULT_ROUTE, {}))
+
+    def violations(self):
+        """Return ``(route, stat, value, limit)`` for every SLO the recorded samples break."""
+        violations = []
+        for route, stats in self.summary().items():
+            for stat, limit in self.slo_for(route).items():
+                if stats.get(stat) is not None and stats[stat] > limit:
+                    violations.append((route, stat, stats[stat], limit))
+        return violations
+
+    def format_table(self):
+        header = f"{'route':<32} {'count':>6} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}"
+        rows = [header, "-" * len(header)]
+        for route, stats in self.summary().items():
+            rows.append(
+                f"{route:<32} {stats['count']:>6} {stats['p50']:>9.1f} {stats['p95']:>9.1f} "
+                f"{stats['p99']:>9.1f} {stats['max']:>9.1f}"
+            )
+        return "\n".join(rows)
@@ -0,0 +1,256 @@
+"""Replay the functional test scenarios as weighted virtual users.
+
+Usage::
+
+    python -m resources.load --users 20 --duration 120
+    python -m resources.load --users 50 --rate 40 --scenario brand_lifecycle=1 --scenario browse_products=4
+"""
+import argparse
+import logging
+import random
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from resources import config, scenarios
+from resources.cleanup import CleanupRegistry
+from resources.client import ApiClient
+from resources.latency import LatencyRecorder, percentile
+from resources.scheduler import TokenBucket
+from resources.token_cache import TokenCache
+
+
+logger = logging.getLogger(__name__)
+
+
+def brand_lifecycle(client, tokens):
+    """Create, update and delete a brand, as in ``tests/crud_test.py``."""
+    payload = scenarios.new_brand_payload()
+    response = scenarios.create_brand(client, payload)
+    if response.status_code != 201:
+        return
+    brand_id = response.json()["id"]
+    scenarios.update_brand(client, brand_id, {"name": f"{payload['name']} upd", "slug": f"{payload['slug']}-upd"})
+    scenarios.delete_brand(client, brand_id, tokens.get(config.ADMIN))
+
+
+def browse_products(client, tokens):
+    """Plain and name-sorted product listings, as in ``tests/test_product_microservice.py``."""
+    scenarios.list_products(client)
+    scenarios.list_products(client, sort="name,asc")
+
+
+def browse_brands(client, tokens):
+    """The brand listing of ``test_001_positive_get_brands``."""
+    scenarios.list_brands(client)
+
+
+def authenticate(client, tokens):
+    """The login behind the ``token`` fixture, bypassing the cache so every iteration hits the API."""
+    scenarios.login(client, random.choice([config.ADMIN, config.USER1, config.USER2]), config.PASSWORD)
+
+
+SCENARIOS = {
+    "brand_lifecycle": brand_lifecycle,
+    "browse_products": browse_products,
+    "browse_brands": browse_brands,
+    "authenticate": authenticate,
+}
+DEFAULT_WEIGHTS = {"brand_lifecycle": 1, "browse_products": 3, "authenticate": 1}
+
+
+class IntervalStats:
+    """Latency and error counts of the current reporting interval, swapped out on every report."""
+
+    def __init__(self, base_path=""):
+        self.base_path = base_path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.recorder = LatencyRecorder(self.base_path)
+        self.requests = 0
+        self.errors = 0
+
+    def hook(self, response, *args, **kwargs):
+        with self._lock:
+            self.recorder.hook(response)
+            self.requests += 1
+            if response.status_code >= 400:
+                self.errors += 1
+
+    def error(self):
+        with self._lock:
+            self.requests += 1
+            self.errors += 1
+
+    def swap(self):
+        with self._lock:
+            snapshot = (self.recorder, self.requests, self.errors)
+            self._reset()
+        return snapshot
+
+
+class Pacer:
+    """Hands out evenly spaced start times so iterations across all users add up to ``rate`` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            slot = max(self._next, time.monotonic())
+            self._next = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class PacedApiClient(ApiClient):
+    """``ApiClient`` spacing out its requests so that, across all users, they add up to ``rate`` per second
+    whatever the scenarios cost. The wait happens before a request is sent, so it never counts toward its
+    ``elapsed`` time, and nothing is retried, so the load stays what was asked for."""
+
+    def __init__(self, rate, **kwargs):
+        super().__init__(**kwargs)
+        self.bucket = TokenBucket(rate, burst=1)
+
+    def request(self, method, url, *args, **kwargs):
+        self.bucket.acquire()
+        return super().request(method, url, *args, **kwargs)
+
+
+class LoadRunner:
+    def __init__(self, client, weights, users, duration, report_interval=5.0):
+        self.client = client
+        self.names = list(weights)
+        self.weights = [weights[name] for name in self.names]
+        self.users = users
+        self.duration = duration
+        self.report_interval = report_interval
+        self.tokens = TokenCache(client)
+        self.totals = LatencyRecorder()
+        self.stats = IntervalStats()
+        self.timeline = []
+        self.requests = 0
+        self.errors = 0
+        self._stop = threading.Event()
+
+    def run(self):
+        self.totals.base_path = self.stats.base_path = urlparse(self.client.base_url).path.rstrip("/")
+        cleanup = CleanupRegistry(self.client)
+        hooks = [self.totals.hook, self.stats.hook, cleanup.track]
+        self.client.hooks["response"].extend(hooks)
+        started = time.monotonic()
+        reporter = threading.Thread(target=self._report, args=(started,), daemon=True)
+        reporter.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.users, thread_name_prefix="vu") as executor:
+                for _ in range(self.users):
+                    executor.submit(self._user, started + self.duration)
+        finally:
+            self._stop.set()
+            reporter.join()
+            for hook in hooks:
+                self.client.hooks["response"].remove(hook)
+            if cleanup.pending:
+                cleanup.drain(self.tokens.get(config.ADMIN))
+        return self.timeline
+
+    def _user(self, deadline):
+        while time.monotonic() < deadline and not self._stop.is_set():
+            scenario = SCENARIOS[random.choices(self.names, self.weights)[0]]
+            try:
+                scenario(self.client, self.tokens)
+            except Exception as error:
+                logger.debug(f"{scenario.__name__} failed: {error}")
+                self.stats.error()
+
+    def _report(self, started):
+        last = started
+        while not self._stop.wait(self.report_interval):
+            last = self._emit(started, last)
+        self._emit(started, last)
+
+    def _emit(self, started, last):
+        now = time.monotonic()
+        recorder, requests, errors = self.stats.swap()
+        self.requests += requests
+        self.errors += errors
+        samples = sorted(sample for route_samples in recorder.samples().values() for sample in route_samples)
+        row = {
+            "elapsed": now - started,
+            "throughput": requests / max(now - last, 1e-9),
+            "error_rate": errors / requests if requests else 0.0,
+            **{f"p{pct}": percentile(samples, pct) for pct in (50, 95, 99)},
+        }
+        self.timeline.append(row)
+        print(
+            f"{row['elapsed']:>7.1f}s {row['throughput']:>8.1f} req/s {row['error_rate']:>7.1%} errors "
+            + " ".join(f"p{pct}={_ms(row[f'p{pct}'])}" for pct in (50, 95, 99)),
+            flush=True,
+        )
+        return now
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.1f}ms"
+
+
+def _parse_weights(values):
+    if not values:
+        return dict(DEFAULT_WEIGHTS)
+    weights = {}
+    for value in values:
+        name, _, weight = value.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"unknown scenario {name!r}, expected one of {sorted(SCENARIOS)}")
+        weights[name] = float(weight or 1)
+    return weights
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m resources.load", description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=10, help="number of concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=60, help="test duration in seconds")
+    parser.add_argument("--rate", type=float, default=None,
+                        help="target requests per second across all users (default: unthrottled)")
+    parser.add_argument("--scenario", action="append", metavar="NAME=WEIGHT",
+                        help=f"weighted scenario to run, repeatable; one of {', '.join(SCENARIOS)}")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between progress reports")
+    parser.add_argument("--max-error-rate", type=float, default=0.01,
+                        help="exit non-zero when more than this share of requests fails")
+    parser.add_argument("--url", default=None, help="API base URL (default: URL from the environment)")
+    args = parser.parse_args(argv)
+
+    try:
+        weights = _parse_weights(args.scenario)
+    except argparse.ArgumentTypeError as error:
+        parser.error(str(error))
+    pool_maxsize = max(args.users, config.POOL_MAXSIZE)
+    if args.rate:
+        client = PacedApiClient(args.rate, base_url=args.url, pool_maxsize=pool_maxsize)
+    else:
+        client = ApiClient(base_url=args.url, pool_maxsize=pool_maxsize)
+    runner = LoadRunner(client, weights, args.users, args.duration, report_interval=args.interval)
+    try:
+        runner.run()
+    finally:
+        client.close()
+    print()
+    print(runner.totals.format_table())
+    error_rate = runner.errors / runner.requests if runner.requests else 0.0
+    print(f"\n{runner.requests} requests, {runner.errors} errors ({error_rate:.1%})")
+    if error_rate > args.max_error_rate:
+        print(f"FAILED error rate {error_rate:.1%} exceeds {args.max_error_rate:.1%}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
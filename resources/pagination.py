@@ -0,0 +1,134 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+MAX_REPORTED = 20
+
+
+def iter_pages(client, path, params=None, prefetch=4):
+    """Yield the pages of a paginated ``{"data": [...], "last_page": n}`` collection in order.
+
+    The first page is fetched to learn ``last_page``; after that up to ``prefetch`` pages are requested
+    concurrently ahead of the consumer, so at most ``prefetch + 1`` pages are held in memory.
+    """
+    params = dict(params or {})
+
+    def fetch(page):
+        response = client.get(path, params={**params, "page": page})
+        response.raise_for_status()
+        return response.json()
+
+    first = fetch(1)
+    yield first
+    last_page = first.get("last_page", 1)
+    executor = ThreadPoolExecutor(max_workers=max(prefetch, 1), thread_name_prefix="paginator")
+    pending = deque()
+    next_page = 2
+    try:
+        while next_page <= last_page or pending:
+            while next_page <= last_page and len(pending) < max(prefetch, 1):
+                pending.append(executor.submit(fetch, next_page))
+                next_page += 1
+            yield pending.popleft().result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_items(client, path, params=None, prefetch=4):
+    """Stream the items of every page of a paginated collection."""
+    for page in iter_pages(client, path, params, prefetch):
+        yield from page["data"]
+
+
+class StreamCheck:
+    """Assertion evaluated item by item while a collection streams past.
+
+    Subclasses implement ``check(index, item)`` and return a message for a violation; the first
+    ``MAX_REPORTED`` messages are kept and the rest only counted.
+    """
+
+    name = "stream check"
+
+    def __init__(self):
+        self.violations = []
+        self.violation_count = 0
+
+    def observe(self, index, item):
+        message = self.check(index, item)
+        if message:
+            self.violation_count += 1
+            if len(self.violations) < MAX_REPORTED:
+                self.violations.append(f"item {index}: {message}")
+
+    def check(self, index, item):
+        raise NotImplementedError
+
+
+class SortedBy(StreamCheck):
+    def __init__(self, key, descending=False):
+        super().__init__()
+        self.key = key
+        self.descending = descending
+        self.name = f"sorted by {key} {'desc' if descending else 'asc'}"
+        self._previous = None
+
+    def check(self, index, item):
+        value, previous = item[self.key], self._previous
+        self._previous = value
+        if previous is not None and (value > previous if self.descending else value < previous):
+            return f"{value!r} follows {previous!r}"
+
+
+class UniqueIds(StreamCheck):
+    name = "unique ids"
+
+    def __init__(self, key="id"):
+        super().__init__()
+        self.key = key
+        self._seen = set()
+
+    def check(self, index, item):
+        value = item[self.key]
+        if value in self._seen:
+            return f"duplicate {self.key} {value!r}"
+        self._seen.add(value)
+
+
+class References(StreamCheck):
+    """``item[key]`` must be one of ``known_ids`` and match the embedded ``item[embedded]["id"]``."""
+
+    def __init__(self, key, known_ids=None, embedded=None):
+        super().__init__()
+        self.key = key
+        self.known_ids = None if known_ids is None else set(known_ids)
+        self.embedded = embedded
+        self.name = f"{key} references"
+
+    def check(self, index, item):
+        value = item[self.key]
+        if self.known_ids is not None and value not in self.known_ids:
+            return f"unknown {self.key} {value!r}"
+        if self.embedded and (item.get(self.embedded) or {}).get("id") != value:
+            return f"{self.key} {value!r} does not match embedded {self.embedded}"
+
+
+class MatchesSchema(StreamCheck):
+    def __init__(self, schema):
+        super().__init__()
+        self.schema = schema
+        self.name = f"{schema.name} schema"
+
+    def check(self, index, item):
+        violations = self.schema.validate(item)
+        if violations:
+            return "; ".join(violations)
+
+
+def run_checks(items, checks):
+    """Feed every item to every check in a single pass and return the number of items seen."""
+    count = 0
+    for index, item in enumerate(items):
+        for check in checks:
+            check.observe(index, item)
+        count += 1
+    return count
@@ -0,0 +1,202 @@
+import socket
+import threading
+import time
+
+from collections import defaultdict
+
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+
+
+SESSION_SCOPE = "session"
+HTTP_PHASES = ("dns", "connect", "tls", "ttfb", "download", "json_decode")
+
+_pending = threading.local()
+
+
+def _pending_phases():
+    if not hasattr(_pending, "phases"):
+        _pending.phases = defaultdict(float)
+    return _pending.phases
+
+
+class _TimedConnectionMixin:
+    """Times DNS resolution and TCP connect of new connections for the response hook on this thread."""
+
+    def _new_conn(self):
+        phases = _pending_phases()
+        host = self._dns_host
+        started = time.perf_counter()
+        try:
+            results = socket.getaddrinfo(host, self.port, allowed_gai_family(), socket.SOCK_STREAM)
+            addresses = list(dict.fromkeys(result[4][0] for result in results))
+        except OSError:
+            # let urllib3 resolve again and raise its own error
+            addresses = [host]
+        resolved = time.perf_counter()
+        phases["dns"] += resolved - started
+        try:
+            # like urllib3, fall back to the next address (e.g. IPv4 after IPv6) when one cannot be reached
+            for index, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    if index == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = host
+            phases["connect"] += time.perf_counter() - resolved
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    def connect(self):
+        phases = _pending_phases()
+        before = phases["dns"] + phases["connect"]
+        started = time.perf_counter()
+        super().connect()
+        phases["tls"] += time.perf_counter() - started - (phases["dns"] + phases["connect"] - before)
+
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class Profiler:
+    """Wall-clock breakdown of the run per test: HTTP phases, JSON decoding and pytest phases.
+
+    HTTP time is split into DNS, TCP connect, TLS handshake (new connections only), time to first byte
+    and body download; ``json_decode`` is time spent in ``response.json()``. Whatever remains of a test's
+    call phase is reported as ``test_code`` (assertions and other test logic).
+    """
+
+    def __init__(self):
+        self.current = SESSION_SCOPE
+        self.stage = None
+        self.tests = defaultdict(lambda: defaultdict(float))
+        self.fixtures = defaultdict(lambda: {"count": 0, "setup": 0.0, "teardown": 0.0, "max": 0.0})
+        self._lock = threading.Lock()
+
+    def install(self, client):
+        """Time new connections of every adapter mounted on ``client`` and hook its responses."""
+        for adapter in client.adapters.values():
+            poolmanager = getattr(adapter, "poolmanager", None)
+            if poolmanager is not None:
+                poolmanager.pool_classes_by_scheme = {
+                    "http": TimedHTTPConnectionPool,
+                    "https": TimedHTTPSConnectionPool,
+                }
+                poolmanager.clear()
+        client.hooks["response"].append(self.hook)
+
+    def uninstall(self, client):
+        client.hooks["response"].remove(self.hook)
+
+    def add(self, phase, seconds, test=None):
+        with self._lock:
+            phases = self.tests[test or self.current]
+            phases[phase] += seconds
+            if phase in HTTP_PHASES and self.stage == "call":
+                phases["call_io"] += seconds
+
+    def add_fixture(self, name, stage, seconds):
+        with self._lock:
+            stats = self.fixtures[name]
+            stats[stage] += seconds
+            stats["max"] = max(stats["max"], seconds)
+            if stage == "setup":
+                stats["count"] += 1
+        self.add(f"fixture_{stage}", seconds)
+
+    def snapshot(self):
+        """Raw per-test and per-fixture times (seconds), e.g. to hand from a pytest-xdist worker to the controller."""
+        with self._lock:
+            return {
+                "tests": {name: dict(phases) for name, phases in self.tests.items()},
+                "fixtures": {name: dict(stats) for name, stats in self.fixtures.items()},
+            }
+
+    def merge(self, snapshot):
+        with self._lock:
+            for name, phases in snapshot["tests"].items():
+                for phase, seconds in phases.items():
+                    self.tests[name][phase] += seconds
+            for name, other in snapshot["fixtures"].items():
+                stats = self.fixtures[name]
+                for stage in ("count", "setup", "teardown"):
+                    stats[stage] += other[stage]
+                stats["max"] = max(stats["max"], other["max"])
+
+    def hook(self, response, *args, **kwargs):
+        phases = _pending_phases()
+        connection = sum(phases[phase] for phase in ("dns", "connect", "tls"))
+        for phase in ("dns", "connect", "tls"):
+            if phases[phase]:
+                self.add(phase, phases[phase])
+        phases.clear()
+        self.add("ttfb", max(response.elapsed.total_seconds() - connection, 0.0))
+        if not kwargs.get("stream"):
+            started = time.perf_counter()
+            response.content
+            self.add("download", time.perf_counter() - started)
+        self._time_json(response)
+
+    def _time_json(self, response):
+        decode = response.json
+        test = self.current
+
+        def timed_json(**kwargs):
+            started = time.perf_counter()
+            try:
+                return decode(**kwargs)
+            finally:
+                self.add("json_decode", time.perf_counter() - started, test)
+        response.json = timed_json
+
+    def report(self, top=10):
+        """Rank the most expensive tests, fixtures and phases; all times in milliseconds."""
+        with self._lock:
+            tests = {name: dict(phases) for name, phases in self.tests.items()}
+            fixtures = {name: dict(stats) for name, stats in self.fixtures.items()}
+        phase_totals = defaultdict(float)
+        ranked_tests = []
+        for name, phases in tests.items():
+            if "call" in phases:
+                phases["test_code"] = max(phases["call"] - phases.pop("call_io", 0.0), 0.0)
+            for phase, seconds in phases.items():
+                if phase in HTTP_PHASES or phase.startswith("fixture_") or phase == "test_code":
+                    phase_totals[phase] += seconds
+            total = sum(phases.get(stage, 0.0) for stage in ("setup", "call", "teardown"))
+            if name != SESSION_SCOPE:
+                ranked_tests.append({"test": name, "total": total * 1000,
+                                     **{phase: seconds * 1000 for phase, seconds in phases.items()}})
+        ranked_tests.sort(key=lambda entry: -entry["total"])
+        ranked_fixtures = sorted(
+            ({"fixture": name, "total": (stats["setup"] + stats["teardown"]) * 1000, "count": stats["count"],
+              "setup": stats["setup"] * 1000, "teardown": stats["teardown"] * 1000, "max": stats["max"] * 1000}
+             for name, stats in fixtures.items()),
+            key=lambda entry: -entry["total"],
+        )
+        ranked_phases = sorted(({"phase": phase, "total": seconds * 1000} for phase, seconds in phase_totals.items()),
+                               key=lambda entry: -entry["total"])
+        return {"tests": ranked_tests[:top], "fixtures": ranked_fixtures[:top], "phases": ranked_phases}
+
+    def format_report(self, top=10):
+        report = self.report(top)
+        lines = ["Slowest tests (ms)"]
+        lines += [f"  {entry['total']:>9.1f}  {entry['test']}" for entry in report["tests"]]
+        lines.append("Slowest fixtures (ms, setup + teardown)")
+        lines += [f"  {entry['total']:>9.1f}  {entry['fixture']} x{entry['count']}" for entry in report["fixtures"]]
+        lines.append("Time by phase (ms)")
+        lines += [f"  {entry['total']:>9.1f}  {entry['phase']}" for entry in report["phases"]]
+        return "\n".join(lines)
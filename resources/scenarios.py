@@ -0,0 +1,39 @@
+"""Request steps shared by the functional tests and the load generator, so both exercise the same flows."""
+from resources.helpers import generate_random_string
+
+
+def new_brand_payload():
+    brand = generate_random_string(6)
+    return {
+        "name": f"new brand {brand}",
+        "slug": f"new-brand-{brand}"
+    }
+
+
+def login(client, email, password):
+    return client.post("/users/login", json={"email": email, "password": password})
+
+
+def list_brands(client):
+    return client.get("/brands")
+
+
+def create_brand(client, payload):
+    return client.post("/brands", json=payload)
+
+
+def update_brand(client, brand_id, payload):
+    return client.put(f"/brands/{brand_id}", json=payload)
+
+
+def delete_brand(client, brand_id, token):
+    return client.delete(f"/brands/{brand_id}", headers={"Authorization": f"Bearer {token}"})
+
+
+def list_products(client, sort=None, page=None):
+    params = {}
+    if sort:
+        params["sort"] = sort
+    if page:
+        params["page"] = page
+    return client.get("/products", params=params)
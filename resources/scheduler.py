@@ -0,0 +1,229 @@
+import email.utils
+import logging
+import math
+import random
+import threading
+import time
+
+from collections import Counter
+from urllib.parse import urlparse
+
+from requests import ConnectionError, Timeout
+
+from resources import config
+from resources.latency import route_template
+
+
+logger = logging.getLogger(__name__)
+
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "PUT", "DELETE")
+# the request was turned away before being processed, so it is safe to resend whatever the method
+THROTTLE_STATUSES = (429,)
+TRANSIENT_STATUSES = (502, 503, 504)
+COUNTERS = ("sent", "throttled", "retried", "recovered", "gave_up")
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average with bursts of up to ``burst``."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Take a token, sleeping until one is available; returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # reserve the token now, so concurrent callers queue up behind each other
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class AdaptiveLimit:
+    """Concurrency limit with additive increase on healthy responses and multiplicative decrease on
+    throttling or slow responses (AIMD).
+
+    A decrease only applies to requests started since the last one, so a burst of 429s answering the same
+    wave of requests halves the limit once rather than once per response.
+    """
+
+    def __init__(self, initial, minimum=1, maximum=None, decrease=0.5):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum or initial
+        self.decrease = decrease
+        self.lowest = self.limit
+        self._in_flight = 0
+        self._epoch = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self._in_flight >= max(self.minimum, math.floor(self.limit)):
+                self._condition.wait()
+            self._in_flight += 1
+            return self._epoch
+
+    def release(self, epoch, healthy):
+        with self._condition:
+            self._in_flight -= 1
+            if healthy:
+                self.limit = min(self.maximum, self.limit + 1 / self.limit)
+            elif epoch == self._epoch:
+                self.limit = max(self.minimum, self.limit * self.decrease)
+                self.lowest = min(self.lowest, self.limit)
+                self._epoch += 1
+            self._condition.notify_all()
+
+
+class RequestScheduler:
+    """Paces, limits and retries every request sent through an ``ApiClient``.
+
+    Requests wait for a token from their host's bucket and their route's bucket (rates of 0 disable a
+    bucket), then for a slot under the adaptive concurrency limit. 429s are retried whatever the method;
+    502/503/504 and connection errors only for idempotent methods. Retries honour ``Retry-After`` (a
+    response asking for more than ``max_backoff`` seconds is returned as is) and otherwise back off
+    exponentially with full jitter. Throttled and retried attempts are counted in
+    ``stats`` and never reach response hooks, so they stay apart from real failures.
+    """
+
+    def __init__(self, rate=None, route_rate=None, concurrency=None, max_retries=None, backoff=None,
+                 max_backoff=10.0, latency_target=None):
+        self.rate = config.RATE_LIMIT if rate is None else rate
+        self.route_rate = config.ROUTE_RATE_LIMIT if route_rate is None else route_rate
+        self.max_retries = config.MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = config.RETRY_BACKOFF if backoff is None else backoff
+        self.max_backoff = max_backoff
+        self.latency_target = config.LATENCY_TARGET if latency_target is None else latency_target
+        self.limit = AdaptiveLimit(concurrency or config.POOL_MAXSIZE)
+        self.base_path = ""
+        self._buckets = {}
+        self._counts = Counter()
+        self._waited = 0.0
+        self._lock = threading.Lock()
+
+    def _bucket(self, key, rate):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate)
+            return bucket
+
+    def _count(self, name, waited=0.0):
+        with self._lock:
+            self._counts[name] += 1
+            self._waited += waited
+
+    def send(self, adapter, request, **kwargs):
+        host = urlparse(request.url).netloc
+        route = route_template(request.method, request.url, self.base_path)
+        retryable = request.method in IDEMPOTENT_METHODS
+        for attempt in range(self.max_retries + 1):
+            waited = 0.0
+            if self.rate:
+                waited += self._bucket(host, self.rate).acquire()
+            if self.route_rate:
+                waited += self._bucket((host, route), self.route_rate).acquire()
+            epoch = self.limit.acquire()
+            started = time.monotonic()
+            try:
+                response = adapter.send(request, **kwargs)
+            except (ConnectionError, Timeout):
+                self.limit.release(epoch, healthy=False)
+                if not retryable:
+                    raise
+                if attempt == self.max_retries:
+                    self._count("gave_up", waited)
+                    raise
+                self._count("retried", waited)
+                logger.info(f"{route} failed to connect, retrying (attempt {attempt + 1})")
+                time.sleep(self._delay(attempt))
+                continue
+            elapsed = (time.monotonic() - started) * 1000
+            throttled = response.status_code in THROTTLE_STATUSES
+            transient = response.status_code in TRANSIENT_STATUSES
+            slow = bool(self.latency_target) and elapsed > self.latency_target
+            self.limit.release(epoch, healthy=not (throttled or transient or slow))
+            if not (throttled or (transient and retryable)):
+                self._count("sent", waited)
+                if attempt and not transient:
+                    self._count("recovered")
+                return response
+            if attempt == self.max_retries:
+                self._count("gave_up", waited)
+                return response
+            retry_after = _retry_after(response) or 0.0
+            if retry_after > self.max_backoff:
+                # waiting that long would stall the run; surface the response instead
+                logger.info(f"{route} returned {response.status_code} with Retry-After {retry_after:.0f}s, giving up")
+                self._count("gave_up", waited)
+                return response
+            self._count("throttled" if throttled else "retried", waited)
+            delay = max(self._delay(attempt), retry_after)
+            logger.info(f"{route} returned {response.status_code}, retrying in {delay:.2f}s (attempt {attempt + 1})")
+            # reading the (small) error body hands the connection back to the pool instead of dropping it
+            response.content
+            response.close()
+            time.sleep(delay)
+
+    def _delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def stats(self):
+        with self._lock:
+            counts = dict(self._counts)
+            waited = self._waited
+        return {
+            **{name: counts.get(name, 0) for name in COUNTERS},
+            "rate_limit_wait_s": round(waited, 3),
+            "concurrency_limit": round(float(self.limit.limit), 1),
+            "lowest_concurrency_limit": round(float(self.limit.lowest), 1),
+        }
+
+
+def merge_stats(stats, other):
+    """Combine the ``stats`` of schedulers in different processes, e.g. pytest-xdist workers."""
+    if not stats:
+        return dict(other)
+    merged = {name: stats.get(name, 0) + other.get(name, 0) for name in COUNTERS}
+    merged["rate_limit_wait_s"] = round(stats["rate_limit_wait_s"] + other["rate_limit_wait_s"], 3)
+    merged["concurrency_limit"] = min(stats["concurrency_limit"], other["concurrency_limit"])
+    merged["lowest_concurrency_limit"] = min(stats["lowest_concurrency_limit"], other["lowest_concurrency_limit"])
+    return merged
+
+
+class ScheduledAdapter:
+    """Routes ``send`` of the wrapped transport adapter through a ``RequestScheduler``."""
+
+    def __init__(self, adapter, scheduler):
+        self.adapter = adapter
+        self.scheduler = scheduler
+
+    def send(self, request, **kwargs):
+        return self.scheduler.send(self.adapter, request, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.adapter, name)
+
+
+def _retry_after(response):
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        moment = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, moment.timestamp() - time.time())
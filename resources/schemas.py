@@ -0,0 +1,176 @@
+from assertpy import soft_fail
+
+
+class Nullable:
+    def __init__(self, schema):
+        self.schema = schema
+
+
+class ListOf:
+    def __init__(self, schema):
+        self.schema = schema
+
+
+class MapOf:
+    """Object with arbitrary string keys whose values all match ``schema``."""
+
+    def __init__(self, schema):
+        self.schema = schema
+
+
+class Schema:
+    """Declarative object schema compiled once into a validator function.
+
+    Fields map to a python type, another ``Schema``, or ``Nullable``/``ListOf``/``MapOf`` wrappers. The
+    compiled validator walks a parsed body in a single pass and reports every violation with its JSON path.
+    """
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+        self._validator = None
+
+    @property
+    def validator(self):
+        if self._validator is None:
+            self._validator = _compile(self.fields)
+        return self._validator
+
+    def validate(self, data):
+        errors = []
+        self.validator(data, ("$",), errors)
+        return [f"{_format_path(path)}: {message}" for path, message in errors]
+
+
+def assert_matches_schema(data, schema):
+    """Soft-fail once per violation; inside ``soft_assertions()`` all of them are reported together."""
+    for violation in schema.validate(data):
+        soft_fail(f"{schema.name} {violation}")
+
+
+def _compile(spec):
+    if isinstance(spec, Schema):
+        return spec.validator
+    if isinstance(spec, dict):
+        return _compile_object(spec)
+    if isinstance(spec, Nullable):
+        return _compile_nullable(_compile(spec.schema))
+    if isinstance(spec, ListOf):
+        return _compile_list(_compile(spec.schema))
+    if isinstance(spec, MapOf):
+        return _compile_map(_compile(spec.schema))
+    if isinstance(spec, type):
+        return _compile_type(spec)
+    raise TypeError(f"Unsupported schema element: {spec!r}")
+
+
+def _compile_type(expected):
+    def validate(value, path, errors):
+        if not isinstance(value, expected):
+            errors.append((path, f"expected {expected.__name__}, got {type(value).__name__}"))
+    return validate
+
+
+def _compile_nullable(inner):
+    def validate(value, path, errors):
+        if value is not None:
+            inner(value, path, errors)
+    return validate
+
+
+def _compile_object(fields):
+    checks = tuple((key, _compile(spec)) for key, spec in fields.items())
+
+    def validate(value, path, errors):
+        if not isinstance(value, dict):
+            errors.append((path, f"expected object, got {type(value).__name__}"))
+            return
+        for key, check in checks:
+            if key in value:
+                check(value[key], path + (key,), errors)
+            else:
+                errors.append((path + (key,), "missing"))
+    return validate
+
+
+def _compile_list(inner):
+    def validate(value, path, errors):
+        if not isinstance(value, list):
+            errors.append((path, f"expected array, got {type(value).__name__}"))
+            return
+        for index, item in enumerate(value):
+            inner(item, path + (index,), errors)
+    return validate
+
+
+def _compile_map(inner):
+    def validate(value, path, errors):
+        if not isinstance(value, dict):
+            errors.append((path, f"expected object, got {type(value).__name__}"))
+            return
+        for key, item in value.items():
+            inner(item, path + (key,), errors)
+    return validate
+
+
+def _format_path(path):
+    return "".join(f"[{part}]" if isinstance(part, int) else (part if part == "$" else f".{part}") for part in path)
+
+
+Brand = Schema("Brand", {
+    "id": int,
+    "name": str,
+    "slug": str,
+})
+
+Category = Schema("Category", {
+    "id": int,
+    "parent_id": int,
+    "name": str,
+    "slug": str,
+})
+
+ProductImage = Schema("ProductImage", {
+    "id": int,
+    "by_name": str,
+    "by_url": str,
+    "source_name": str,
+    "source_url": str,
+    "file_name": str,
+    "title": str,
+})
+
+Product = Schema("Product", {
+    "id": int,
+    "name": str,
+    "description": str,
+    "stock": int,
+    "price": float,
+    "is_location_offer": int,
+    "is_rental": int,
+    "brand_id": int,
+    "category_id": int,
+    "product_image_id": int,
+    "product_image": ProductImage,
+    "category": Category,
+    "brand": Brand,
+})
+
+ProductPage = Schema("ProductPage", {
+    "current_page": int,
+    "data": ListOf(Product),
+    "from": Nullable(int),
+    "last_page": int,
+    "per_page": int,
+    "to": Nullable(int),
+    "total": int,
+})
+
+BrandList = Schema("BrandList", ListOf(Brand))
+
+# 422 bodies: {"field": ["message", ...]}
+ValidationErrors = Schema("ValidationErrors", MapOf(ListOf(str)))
+
+ErrorMessage = Schema("ErrorMessage", {
+    "message": str,
+})
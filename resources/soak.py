@@ -0,0 +1,289 @@
+"""Run the brand lifecycle and product listings at a steady rate for hours and watch for gradual drift.
+
+Usage::
+
+    python -m resources.soak run --duration 4h --rate 2 --samples soak.jsonl
+    python -m resources.soak analyse --samples soak.jsonl --window 300
+"""
+import argparse
+import json
+import logging
+import statistics
+import sys
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from resources import config
+from resources.cleanup import CleanupRegistry
+from resources.client import ApiClient
+from resources.latency import percentile, route_template
+from resources.load import SCENARIOS, Pacer
+from resources.token_cache import TokenCache
+
+
+logger = logging.getLogger(__name__)
+
+SOAK_SCENARIOS = ("brand_lifecycle", "browse_products", "browse_brands")
+PAYLOAD_ROUTE = "GET /brands"
+
+
+class SampleWriter:
+    """Writes one JSON line per request to ``path`` so nothing accumulates in memory.
+
+    Sample times restart at 0 on every run, so a file holds exactly one run: an existing file is refused
+    unless ``overwrite`` is set, in which case it is truncated.
+    """
+
+    def __init__(self, path, overwrite=False):
+        self._file = open(path, "w" if overwrite else "x", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, sample):
+        line = json.dumps(sample, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def flush(self):
+        with self._lock:
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class Window:
+    """Latencies, errors and ``GET /brands`` payload sizes of one summary window."""
+
+    def __init__(self, start):
+        self.start = start
+        self.latencies = []
+        self.payload_sizes = []
+        self.requests = 0
+        self.errors = 0
+
+    def add(self, sample):
+        self.requests += 1
+        status = sample.get("status")
+        if status is None or status >= 400:
+            self.errors += 1
+        if sample.get("ms") is not None:
+            self.latencies.append(sample["ms"])
+        if sample.get("route") == PAYLOAD_ROUTE and status == 200:
+            self.payload_sizes.append(sample["bytes"])
+
+    def summary(self):
+        latencies = sorted(self.latencies)
+        return {
+            "start": self.start,
+            "requests": self.requests,
+            "error_rate": self.errors / self.requests if self.requests else 0.0,
+            **{f"p{pct}": percentile(latencies, pct) for pct in (50, 95, 99)},
+            "brands_bytes": statistics.median(self.payload_sizes) if self.payload_sizes else None,
+        }
+
+
+class DriftCheck:
+    """Compares the median of a metric over the first and the last ``span`` windows."""
+
+    def __init__(self, metric, tolerance, relative=True):
+        self.metric = metric
+        self.tolerance = tolerance
+        self.relative = relative
+
+    def evaluate(self, windows, span):
+        values = [window[self.metric] for window in windows if window[self.metric] is not None]
+        if len(values) < 2 * span:
+            return None
+        baseline, recent = statistics.median(values[:span]), statistics.median(values[-span:])
+        change = (recent - baseline) / baseline if self.relative and baseline else recent - baseline
+        if change <= self.tolerance:
+            return None
+        amount = f"{change:+.0%}" if self.relative else f"{change:+.2%}"
+        return f"{self.metric} drifted {amount}: {_fmt(baseline)} -> {_fmt(recent)} (tolerance {self.tolerance:g})"
+
+
+def find_drift(windows, checks, span):
+    return [finding for finding in (check.evaluate(windows, span) for check in checks) if finding]
+
+
+class SoakRunner:
+    """Loops the soak scenarios at ``rate`` iterations per second and closes a summary window every
+    ``window`` seconds; only window summaries are kept in memory, every sample goes to ``writer``."""
+
+    def __init__(self, client, writer, duration, rate, users=4, window=60.0):
+        self.client = client
+        self.writer = writer
+        self.duration = duration
+        self.pacer = Pacer(rate)
+        self.users = users
+        self.window_length = window
+        self.tokens = TokenCache(client)
+        self.windows = []
+        self._base_path = ""
+        self._window = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._started = None
+
+    def hook(self, response, *args, **kwargs):
+        request = response.request
+        self._add({
+            "t": round(time.monotonic() - self._started, 3),
+            "route": route_template(request.method, request.url, self._base_path),
+            "status": response.status_code,
+            "ms": round(response.elapsed.total_seconds() * 1000, 2),
+            "bytes": len(response.content or b""),
+        })
+
+    def _add(self, sample):
+        self.writer.write(sample)
+        with self._lock:
+            self._window.add(sample)
+
+    def run(self):
+        self._base_path = urlparse(self.client.base_url).path.rstrip("/")
+        self._started = time.monotonic()
+        self._window = Window(0.0)
+        cleanup = CleanupRegistry(self.client)
+        hooks = [self.hook, cleanup.track]
+        self.client.hooks["response"].extend(hooks)
+        reporter = threading.Thread(target=self._report, daemon=True)
+        reporter.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.users, thread_name_prefix="soak") as executor:
+                for index in range(self.users):
+                    executor.submit(self._user, index)
+        finally:
+            self._stop.set()
+            reporter.join()
+            for hook in hooks:
+                self.client.hooks["response"].remove(hook)
+            # a lifecycle interrupted between create and delete leaves its brand behind
+            if cleanup.pending:
+                cleanup.drain(self.tokens.get(config.ADMIN))
+        return self.windows
+
+    def _user(self, index):
+        deadline = self._started + self.duration
+        iteration = index
+        while time.monotonic() < deadline and not self._stop.is_set():
+            self.pacer.wait()
+            scenario = SCENARIOS[SOAK_SCENARIOS[iteration % len(SOAK_SCENARIOS)]]
+            iteration += self.users
+            try:
+                scenario(self.client, self.tokens)
+            except Exception as error:
+                logger.debug(f"{scenario.__name__} failed: {error}")
+                self._add({"t": round(time.monotonic() - self._started, 3), "route": scenario.__name__,
+                           "status": None, "ms": None, "error": str(error)})
+
+    def _report(self):
+        while not self._stop.wait(self.window_length):
+            self._close_window()
+        self._close_window()
+
+    def _close_window(self):
+        with self._lock:
+            window, self._window = self._window, Window(round(time.monotonic() - self._started, 3))
+        self.writer.flush()
+        if window.requests:
+            summary = window.summary()
+            self.windows.append(summary)
+            print(format_window(summary), flush=True)
+
+
+def read_windows(path, length):
+    """Rebuild window summaries from a sample file, reading it one line at a time."""
+    windows, open_windows = [], {}
+    with open(path, encoding="utf-8") as samples:
+        for line in samples:
+            if not line.strip():
+                continue
+            sample = json.loads(line)
+            index = int(sample["t"] // length)
+            open_windows.setdefault(index, Window(index * length)).add(sample)
+            # samples are written nearly in order; anything two windows back is complete
+            for done in sorted(key for key in open_windows if key < index - 1):
+                windows.append(open_windows.pop(done).summary())
+    windows.extend(open_windows.pop(key).summary() for key in sorted(open_windows))
+    return windows
+
+
+def format_window(window):
+    return (
+        f"{window['start']:>9.0f}s {window['requests']:>7} req {window['error_rate']:>7.1%} errors "
+        + " ".join(f"p{pct}={_ms(window[f'p{pct}'])}" for pct in (50, 95, 99))
+        + f" /brands={_fmt(window['brands_bytes'])}B"
+    )
+
+
+def _ms(value):
+    return "-" if value is None else f"{value:.1f}ms"
+
+
+def _fmt(value):
+    if value is None:
+        return "-"
+    return f"{value:.4g}" if isinstance(value, float) else str(value)
+
+
+def _duration(value):
+    units = {"s": 1, "m": 60, "h": 3600}
+    if value and value[-1] in units:
+        return float(value[:-1]) * units[value[-1]]
+    return float(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m resources.soak", description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["run", "analyse"])
+    parser.add_argument("--samples", default="soak-samples.jsonl", help="JSON-lines file samples are written to")
+    parser.add_argument("--overwrite", action="store_true", help="replace an existing sample file")
+    parser.add_argument("--duration", type=_duration, default=3600, help="run time, in seconds or with s/m/h suffix")
+    parser.add_argument("--rate", type=float, default=2, help="scenario iterations per second across all users")
+    parser.add_argument("--users", type=int, default=4, help="concurrent virtual users")
+    parser.add_argument("--window", type=_duration, default=60, help="length of a summary window")
+    parser.add_argument("--span", type=int, default=5, help="windows forming the baseline and the recent level")
+    parser.add_argument("--p95-drift", type=float, default=0.25, help="tolerated relative rise of p95")
+    parser.add_argument("--payload-drift", type=float, default=0.10, help="tolerated relative growth of GET /brands")
+    parser.add_argument("--error-drift", type=float, default=0.01, help="tolerated absolute rise of the error rate")
+    parser.add_argument("--url", default=None, help="API base URL (default: URL from the environment)")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        try:
+            writer = SampleWriter(args.samples, overwrite=args.overwrite)
+        except FileExistsError:
+            parser.error(f"{args.samples} already holds a run; pass --overwrite or choose another --samples")
+        client = ApiClient(base_url=args.url, pool_maxsize=max(args.users, config.POOL_MAXSIZE))
+        runner = SoakRunner(client, writer, args.duration, args.rate, users=args.users, window=args.window)
+        try:
+            windows = runner.run()
+        finally:
+            writer.close()
+            client.close()
+    else:
+        windows = read_windows(args.samples, args.window)
+        for window in windows:
+            print(format_window(window))
+
+    checks = [
+        DriftCheck("p95", args.p95_drift),
+        DriftCheck("brands_bytes", args.payload_drift),
+        DriftCheck("error_rate", args.error_drift, relative=False),
+    ]
+    findings = find_drift(windows, checks, args.span)
+    print()
+    for finding in findings:
+        print(f"DRIFT {finding}")
+    if not findings:
+        print(f"No drift across {len(windows)} window(s)")
+    return 1 if findings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+import base64
+import json
+import logging
+import os
+import threading
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager
+
+from resources import config, scenarios
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX platforms only get in-process locking
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300
+
+
+def decode_expiry(token):
+    """Return the ``exp`` claim of a JWT as a unix timestamp, or ``None`` if it cannot be read."""
+    try:
+        payload = token.split(".")[1]
+        payload += "=" * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload))["exp"])
+    except (IndexError, KeyError, TypeError, ValueError):
+        return None
+
+
+class TokenCache:
+    """Access tokens shared by every test in the session, keyed by account.
+
+    Tokens are refreshed ``refresh_margin`` seconds before their JWT expiry. Threads are serialised per
+    account and, when ``path`` is given, processes share the cache through a ``flock``-protected JSON file
+    so parallel workers log in once per account instead of once each. The file is meant to live for one
+    run only; ``track``, installed as a response hook, drops a token the API answers with 401 so the next
+    ``get`` logs in again instead of reusing it until it expires.
+    """
+
+    def __init__(self, client, path=None, password=None, refresh_margin=None):
+        self.client = client
+        self.path = str(path) if path else None
+        self.password = password or config.PASSWORD
+        self.refresh_margin = config.TOKEN_REFRESH_MARGIN if refresh_margin is None else refresh_margin
+        self.logins = 0
+        self._tokens = {}
+        self._guard = threading.Lock()
+        self._account_locks = defaultdict(threading.Lock)
+
+    def get(self, email):
+        key = f"{self.client.base_url}|{email}"
+        with self._guard:
+            account_lock = self._account_locks[key]
+        with account_lock:
+            entry = self._tokens.get(key)
+            if not self._is_fresh(entry):
+                with self._shared_lock():
+                    entry = self._read_shared().get(key)
+                    if not self._is_fresh(entry):
+                        entry = self._login(email)
+                        self._write_shared(key, entry)
+                self._tokens[key] = entry
+            return entry["token"]
+
+    def invalidate(self, email=None, token=None):
+        """Forget the token of ``email`` (of every account when ``None``) here and in the shared file.
+
+        With ``token``, only an entry still holding that token is dropped, so a fresh login made by another
+        thread or worker in the meantime survives.
+        """
+        def stale(key, entry):
+            return (email is None or key == f"{self.client.base_url}|{email}") and (
+                token is None or entry["token"] == token
+            )
+
+        with self._guard:
+            for key in [key for key, entry in self._tokens.items() if stale(key, entry)]:
+                del self._tokens[key]
+        if self.path is None:
+            return
+        with self._shared_lock():
+            tokens = self._read_shared()
+            kept = {key: entry for key, entry in tokens.items() if not stale(key, entry)}
+            if len(kept) != len(tokens):
+                self._replace_shared(kept)
+
+    def track(self, response, *args, **kwargs):
+        if response.status_code != 401:
+            return
+        token = response.request.headers.get("Authorization", "").partition(" ")[2]
+        with self._guard:
+            emails = [key.split("|", 1)[1] for key, entry in self._tokens.items() if entry["token"] == token]
+        for email in emails:
+            # a restarted or reset server no longer accepts tokens it issued before; log in again next time
+            logger.info(f"Token for {email} was rejected, dropping it from the cache")
+            self.invalidate(email, token=token)
+
+    def _is_fresh(self, entry):
+        return entry is not None and entry["exp"] - self.refresh_margin > time.time()
+
+    def _login(self, email):
+        login_response = scenarios.login(self.client, email, self.password)
+        access_token = login_response.json()["access_token"]
+        self.logins += 1
+        expires_in = login_response.json().get("expires_in") or DEFAULT_TTL
+        return {"token": access_token, "exp": decode_expiry(access_token) or time.time() + expires_in}
+
+    @contextmanager
+    def _shared_lock(self):
+        if self.path is None or fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_shared(self):
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path) as cache_file:
+                return json.load(cache_file)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_shared(self, key, entry):
+        if self.path is None:
+            return
+        now = time.time()
+        tokens = {cached_key: cached for cached_key, cached in self._read_shared().items() if cached["exp"] > now}
+        tokens[key] = entry
+        self._replace_shared(tokens)
+
+    def _replace_shared(self, tokens):
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as cache_file:
+            json.dump(tokens, cache_file)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,233 @@
+"""SQLite store of per-run latency distributions and regression checks against a rolling baseline.
+
+Usage::
+
+    python -m resources.trends compare --db perf-history/trends.sqlite
+    python -m resources.trends report --db perf-history/trends.sqlite
+"""
+import argparse
+import json
+import math
+import sqlite3
+import statistics
+import sys
+import time
+
+from resources.latency import percentile
+
+
+MAX_SAMPLES = 2000
+SPARK = "▁▂▃▄▅▆▇█"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at REAL NOT NULL,
+    label TEXT,
+    base_url TEXT,
+    wall_time REAL NOT NULL,
+    exit_status INTEGER
+);
+CREATE TABLE IF NOT EXISTS route_stats (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    route TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    p50 REAL, p95 REAL, p99 REAL, max REAL,
+    samples TEXT NOT NULL,
+    PRIMARY KEY (run_id, route)
+);
+"""
+
+
+class TrendStore:
+    def __init__(self, path):
+        self.connection = sqlite3.connect(str(path))
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def record_run(self, samples, wall_time, started_at=None, label=None, base_url=None, exit_status=None):
+        """Store one run; ``samples`` maps route to a list of latencies in milliseconds."""
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (started_at, label, base_url, wall_time, exit_status) VALUES (?, ?, ?, ?, ?)",
+                (started_at or time.time(), label, base_url, wall_time, exit_status),
+            )
+            run_id = cursor.lastrowid
+            for route, route_samples in samples.items():
+                route_samples = sorted(route_samples)
+                self.connection.execute(
+                    "INSERT INTO route_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        run_id, route, len(route_samples),
+                        percentile(route_samples, 50), percentile(route_samples, 95),
+                        percentile(route_samples, 99), route_samples[-1],
+                        json.dumps([round(value, 2) for value in _downsample(route_samples)]),
+                    ),
+                )
+        return run_id
+
+    def runs(self, limit=None, base_url=None, before=None, passed_only=False):
+        """Return ``(id, started_at, label, wall_time)`` rows, oldest first.
+
+        Optionally only runs against ``base_url``, older than run ``before``, or that exited with status 0
+        (runs stored without a status count as passed).
+        """
+        conditions, params = [], []
+        if base_url is not None:
+            conditions.append("base_url IS ?")
+            params.append(base_url)
+        if before is not None:
+            conditions.append("id < ?")
+            params.append(before)
+        if passed_only:
+            conditions.append("COALESCE(exit_status, 0) = 0")
+        where = f"WHERE {' AND '.join(conditions)} " if conditions else ""
+        rows = self.connection.execute(
+            f"SELECT id, started_at, label, wall_time FROM runs {where}ORDER BY id DESC LIMIT ?",
+            (*params, limit or -1),
+        ).fetchall()
+        return rows[::-1]
+
+    def base_url(self, run_id):
+        row = self.connection.execute("SELECT base_url FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return row[0] if row else None
+
+    def route_samples(self, run_id):
+        rows = self.connection.execute("SELECT route, samples FROM route_stats WHERE run_id = ?", (run_id,))
+        return {route: json.loads(samples) for route, samples in rows}
+
+    def route_history(self, route, limit):
+        rows = self.connection.execute(
+            "SELECT run_id, p50, p95 FROM route_stats WHERE route = ? ORDER BY run_id DESC LIMIT ?", (route, limit)
+        ).fetchall()
+        return rows[::-1]
+
+    def routes(self):
+        return [row[0] for row in self.connection.execute("SELECT DISTINCT route FROM route_stats ORDER BY route")]
+
+
+def mann_whitney_greater(current, baseline):
+    """One-sided Mann-Whitney U p-value for ``current`` being stochastically larger than ``baseline``."""
+    n1, n2 = len(current), len(baseline)
+    combined = sorted([(value, True) for value in current] + [(value, False) for value in baseline])
+    ranks = [0.0] * len(combined)
+    ties = 0.0
+    start = 0
+    while start < len(combined):
+        end = start
+        while end + 1 < len(combined) and combined[end + 1][0] == combined[start][0]:
+            end += 1
+        for index in range(start, end + 1):
+            ranks[index] = (start + end) / 2 + 1
+        tied = end - start + 1
+        ties += tied ** 3 - tied
+        start = end + 1
+    u_current = sum(rank for rank, (_, is_current) in zip(ranks, combined) if is_current) - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1)))
+    if variance <= 0:
+        return 1.0
+    z = (u_current - n1 * n2 / 2 - 0.5) / math.sqrt(variance)
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def find_regressions(store, window=7, alpha=0.01, min_effect=0.10, min_delta=5.0, min_samples=3,
+                     include_failed=False):
+    """Compare the latest run with the pooled samples of the ``window`` runs before it.
+
+    The baseline only holds runs against the latest run's base URL and, unless ``include_failed`` is set,
+    runs that passed. A route regresses when its samples are significantly slower (Mann-Whitney, ``alpha``)
+    and its median grew by more than ``min_effect`` and ``min_delta`` milliseconds. Suite wall time
+    regresses when it is more than three standard deviations and ``min_effect`` above the baseline mean.
+    """
+    runs = store.runs(1)
+    if not runs:
+        return []
+    latest = runs[-1]
+    baseline_runs = store.runs(
+        window, base_url=store.base_url(latest[0]), before=latest[0], passed_only=not include_failed
+    )
+    if not baseline_runs:
+        return []
+    baseline = {}
+    for run in baseline_runs:
+        for route, samples in store.route_samples(run[0]).items():
+            baseline.setdefault(route, []).extend(samples)
+    regressions = []
+    for route, samples in sorted(store.route_samples(latest[0]).items()):
+        reference = baseline.get(route, [])
+        if len(samples) < min_samples or len(reference) < min_samples:
+            continue
+        current_median, baseline_median = statistics.median(samples), statistics.median(reference)
+        p_value = mann_whitney_greater(samples, reference)
+        slower = current_median > max(baseline_median * (1 + min_effect), baseline_median + min_delta)
+        if p_value < alpha and slower:
+            regressions.append(
+                f"{route}: median {baseline_median:.1f} -> {current_median:.1f} ms (p={p_value:.4f})"
+            )
+    wall_times = [run[3] for run in baseline_runs]
+    if len(wall_times) >= 3:
+        mean, stdev = statistics.mean(wall_times), statistics.stdev(wall_times)
+        if latest[3] > mean + 3 * stdev and latest[3] > mean * (1 + min_effect):
+            regressions.append(f"suite wall time: mean {mean:.1f} -> {latest[3]:.1f} s")
+    return regressions
+
+
+def trend_report(store, limit=14):
+    lines = []
+    runs = store.runs(limit)
+    if runs:
+        wall_times = [run[3] for run in runs]
+        lines.append(f"{'suite wall time (s)':<32} {_sparkline(wall_times)} {wall_times[-1]:>9.1f}")
+    for route in store.routes():
+        p95s = [p95 for _, _, p95 in store.route_history(route, limit)]
+        lines.append(f"{route + ' p95 (ms)':<32} {_sparkline(p95s)} {p95s[-1]:>9.1f}")
+    return "\n".join(lines)
+
+
+def _downsample(sorted_samples):
+    if len(sorted_samples) <= MAX_SAMPLES:
+        return sorted_samples
+    step = (len(sorted_samples) - 1) / (MAX_SAMPLES - 1)
+    return [sorted_samples[round(index * step)] for index in range(MAX_SAMPLES)]
+
+
+def _sparkline(values):
+    low, high = min(values), max(values)
+    span = (high - low) or 1
+    return "".join(SPARK[int((value - low) / span * (len(SPARK) - 1))] for value in values)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m resources.trends", description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["compare", "report"])
+    parser.add_argument("--db", required=True, help="path to the trend database")
+    parser.add_argument("--window", type=int, default=7, help="number of previous runs forming the baseline")
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance level for regressions")
+    parser.add_argument("--min-effect", type=float, default=0.10, help="minimum relative slowdown to report")
+    parser.add_argument("--min-delta", type=float, default=5.0, help="minimum median slowdown in milliseconds")
+    parser.add_argument("--include-failed", action="store_true", help="let runs with failures into the baseline")
+    args = parser.parse_args(argv)
+
+    store = TrendStore(args.db)
+    try:
+        if args.command == "report":
+            print(trend_report(store, limit=args.window * 2))
+            return 0
+        regressions = find_regressions(
+            store, window=args.window, alpha=args.alpha, min_effect=args.min_effect, min_delta=args.min_delta,
+            include_failed=args.include_failed,
+        )
+    finally:
+        store.close()
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No performance regressions against the rolling baseline")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,8 @@
 pytest_plugins = [
-    "fixtures.api"
+    "fixtures.api",
+    "fixtures.cassette",
+    "fixtures.fake_server",
+    "fixtures.latency",
+    "fixtures.profiling",
+    "fixtures.trends",
 ]
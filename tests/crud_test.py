@@ -1,66 +1,46 @@
-import requests
+from resources import scenarios
+from resources.config import ADMIN
 
-from resources.config import URL
-from resources.helpers import generate_random_string
 
-
-def test_001_get_brands():
-    response = requests.get(f"{URL}/brands")
+def test_001_get_brands(api_client):
+    response = scenarios.list_brands(api_client)
 
     assert response.status_code == 200, f"Unexpected status code: {response.status_code}"
     assert len(response.json()) > 0, "Brands list is empty"
 
 
-def test_002_post_brand():
-    brand = generate_random_string(6)
-    payload = {
-        "name": f"new brand {brand}",
-        "slug": f"new-brand-{brand}"
-    }
+def test_002_post_brand(api_client):
+    payload = scenarios.new_brand_payload()
 
-    response = requests.post(f"{URL}/brands", json=payload)
+    response = scenarios.create_brand(api_client, payload)
 
     assert response.status_code == 201, f"Unexpected status code: {response.status_code}"
     assert response.json()["name"] == payload["name"], f"Unexpected response payload name: {response.json()['name']}"
     assert response.json()["slug"] == payload["slug"], f"Unexpected response payload slug: {response.json()['slug']}"
 
 
-def test_003_put_brand():
-    brand = generate_random_string(6)
-    payload = {
-        "name": f"new brand {brand}",
-        "slug": f"new-brand-{brand}"
-    }
+def test_003_put_brand(api_client):
+    payload = scenarios.new_brand_payload()
 
-    response_post = requests.post(f"{URL}/brands", json=payload)
+    response_post = scenarios.create_brand(api_client, payload)
     brand_id = response_post.json()["id"]
     payload_update = {
-        "name": f"new brand {brand} upd",
-        "slug": f"new-brand-{brand}-upd"
+        "name": f"{payload['name']} upd",
+        "slug": f"{payload['slug']}-upd"
     }
-    response_update = requests.put(f"{URL}/brands/{brand_id}", json=payload_update)
+    response_update = scenarios.update_brand(api_client, brand_id, payload_update)
 
     assert response_update.status_code == 200, f"Unexpected status code: {response_update.status_code}"
     assert response_update.json()["success"] is True
 
 
-def test_004_delete_brand():
-    login_payload = {
-        "email": "admin@practicesoftwaretesting.com",
-        "password": "welcome01"
-    }
-    login_response = requests.post(f"{URL}/users/login", json=login_payload)
-    access_token = login_response.json()["access_token"]
+def test_004_delete_brand(api_client, token_cache):
+    access_token = token_cache.get(ADMIN)
 
-    brand = generate_random_string(6)
-    payload = {
-        "name": f"new brand {brand}",
-        "slug": f"new-brand-{brand}"
-    }
+    payload = scenarios.new_brand_payload()
 
-    response_post = requests.post(f"{URL}/brands", json=payload)
+    response_post = scenarios.create_brand(api_client, payload)
     brand_id = response_post.json()["id"]
 
-    headers = {"Authorization": f"Bearer {access_token}"}
-    response_delete = requests.delete(f"{URL}/brands/{brand_id}", headers=headers)
+    response_delete = scenarios.delete_brand(api_client, brand_id, access_token)
     assert response_delete.status_code == 204, f"Unexpected status code: {response_delete.status_code}"
@@ -1,13 +1,14 @@
 import allure
+import asyncio
 import pytest
-import requests
-
-from datetime import timedelta
 
 from assertpy import assert_that, soft_assertions
 
-from resources.config import URL, ADMIN, USER1
+from resources.config import ADMIN, USER1
+from resources.contention import contend_post_same_slug, contend_put_same_name
+from resources.fuzz import describe, fuzz_brands
 from resources.helpers import generate_random_string
+from resources.schemas import BrandList, ErrorMessage, ValidationErrors, assert_matches_schema
 
 
 @allure.description("""
@@ -40,26 +41,26 @@ Description: This endpoint allows you to delete a specific brand based on its id
 deletion, the response confirms the deletion operation.
 """)
 class TestBrandsMicroservice:
-    def test_001_positive_get_brands(self):
-        response = requests.get(f"{URL}/brands", timeout=5)
-        response_2 = requests.get(f"{URL}/brands", timeout=5)
+    @pytest.mark.asyncio
+    async def test_001_positive_get_brands(self, async_api_client):
+        # both fetches go to the API: the test compares two live responses
+        response, response_2 = await asyncio.gather(
+            async_api_client.get("/brands", use_cache=False), async_api_client.get("/brands", use_cache=False)
+        )
+        payload = response.json()
         with soft_assertions():
             # status code verification
             assert_that(response.status_code).is_equal_to(200)
             # response payload verification
-            assert_that(response.json()).is_instance_of(list)
-            assert_that(response.json()[0]["id"]).is_instance_of(int)
-            assert_that(response.json()[0]["name"]).is_instance_of(str)
-            assert_that(response.json()[0]["slug"]).is_instance_of(str)
+            assert_that(payload).is_not_empty()
+            assert_matches_schema(payload, BrandList)
             # response headers verification
             assert_that(response.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response.headers["content-type"]).is_equal_to("application/json;charset=UTF-8")
-            # response performance verification
-            assert_that(response.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
             # state validation
-            assert_that(response.json()).is_equal_to(response_2.json())
+            assert_that(payload).is_equal_to(response_2.json())
 
-    def test_002_negative_post_brand_with_existing_slug(self):
+    def test_002_negative_post_brand_with_existing_slug(self, api_client):
         name_suffix = generate_random_string(6)
         new_name_suffix = generate_random_string(6)
         slug_suffix = generate_random_string(6)
@@ -67,73 +68,68 @@ class TestBrandsMicroservice:
             "name": f"new brand {name_suffix}",
             "slug": f"new-brand-{slug_suffix}"
         }
-        response_1 = requests.post(f"{URL}/brands", json=payload_1, timeout=5)
+        response_1 = api_client.post("/brands", json=payload_1)
         assert_that(response_1.status_code).is_equal_to(201)
 
         payload_2 = {
             "name": f"new brand {new_name_suffix}",
             "slug": f"new-brand-{slug_suffix}"
         }
-        response_2 = requests.post(f"{URL}/brands", json=payload_2, timeout=5)
+        response_2 = api_client.post("/brands", json=payload_2)
 
         with soft_assertions():
             assert_that(response_2.status_code).is_equal_to(422)
+            assert_matches_schema(response_2.json(), ValidationErrors)
             assert_that(response_2.json()["slug"][0]).is_equal_to("A brand already exists with this slug.")
             # response headers verification
             assert_that(response_2.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response_2.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response_2.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
-    def test_003_negative_post_brand_with_existing_name(self, create_brand):
-        name_suffix = create_brand["name"]
+    def test_003_negative_post_brand_with_existing_name(self, api_client, pooled_brand):
         new_slug_suffix = generate_random_string(6)
 
         payload_2 = {
-            "name": f"new brand {name_suffix}",
+            "name": pooled_brand["name"],
             "slug": f"new-brand-{new_slug_suffix}"
         }
-        response_2 = requests.post(f"{URL}/brands", json=payload_2, timeout=5)
+        response_2 = api_client.post("/brands", json=payload_2)
 
         with soft_assertions():
             assert_that(response_2.status_code).is_equal_to(422)
+            assert_matches_schema(response_2.json(), ValidationErrors)
             assert_that(response_2.json()["name"][0]).is_equal_to("A brand already exists with this name.")
             # response headers verification
             assert_that(response_2.headers["cache-control"]).is_equal_to("no-cache, private")
-            assert_that(response_2.headers["content-type"]).is_equal_to("application/json;charset=UTF-8")
-            # response performance verification
-            assert_that(response_2.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
+            assert_that(response_2.headers["content-type"]).is_equal_to("application/json")
 
-    def test_004_negative_post_brand_with_existing_name_and_brand(self, create_brand):
-        payload = create_brand
+    def test_004_negative_post_brand_with_existing_name_and_brand(self, api_client, pooled_brand):
+        payload = pooled_brand
         del payload["id"]
 
-        response_2 = requests.post(f"{URL}/brands", json=payload, timeout=5)
+        response_2 = api_client.post("/brands", json=payload)
 
         with soft_assertions():
             assert_that(response_2.status_code).is_equal_to(422)
+            assert_matches_schema(response_2.json(), ValidationErrors)
             assert_that(response_2.json()["slug"][0]).is_equal_to("A brand already exists with this slug.")
             # response headers verification
             assert_that(response_2.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response_2.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response_2.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
     @pytest.mark.parametrize("token", [{"email": ADMIN}], indirect=True)
-    def test_005_negative_delete_not_existing_brand(self, token):
+    def test_005_negative_delete_not_existing_brand(self, api_client, token):
         headers = {"Authorization": f"Bearer {token}"}
-        response = requests.delete(f"{URL}/brands/99999999", headers=headers)
+        response = api_client.delete("/brands/99999999", headers=headers)
         with soft_assertions():
             assert_that(response.status_code).is_equal_to(422)
+            assert_matches_schema(response.json(), ValidationErrors)
             assert_that(response.json()["id"][0]).is_equal_to("The selected id is invalid.")
             # response headers verification
             assert_that(response.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
-    def test_006_negative_update_name_and_slug_to_existing_one(self):
-        response_1 = requests.get(f"{URL}/brands", timeout=5)
+    def test_006_negative_update_name_and_slug_to_existing_one(self, api_client):
+        response_1 = api_client.get("/brands")
         assert_that(response_1.status_code).is_equal_to(200)
         existing_brand_payload = response_1.json()[0]
         del existing_brand_payload["id"]
@@ -145,58 +141,56 @@ class TestBrandsMicroservice:
             "slug": f"new-brand-{slug_suffix}"
         }
 
-        response_2 = requests.post(f"{URL}/brands", json=payload, timeout=5)
+        response_2 = api_client.post("/brands", json=payload)
         brand_id = response_2.json()["id"]
         assert_that(response_2.status_code).is_equal_to(201)
 
-        response_3 = requests.put(f"{URL}/brands/{brand_id}", json=existing_brand_payload, timeout=5)
+        response_3 = api_client.put(f"/brands/{brand_id}", json=existing_brand_payload)
         with soft_assertions():
             assert_that(response_3.status_code).is_equal_to(422)
+            assert_matches_schema(response_3.json(), ErrorMessage)
             assert_that(response_3.json()["message"]).is_equal_to("Duplicate Entry")
             # response headers verification
             assert_that(response_3.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response_3.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response_3.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
-    def test_007_negative_create_brand_with_missing_data(self):
+    def test_007_negative_create_brand_with_missing_data(self, api_client):
         payload = {
             "name": None,
             "slug": None
         }
 
-        response = requests.post(f"{URL}/brands", json=payload, timeout=5)
+        response = api_client.post("/brands", json=payload)
         with soft_assertions():
             assert_that(response.status_code).is_equal_to(422)
+            assert_matches_schema(response.json(), ValidationErrors)
             assert_that(response.json()["name"][0]).is_equal_to("The name field is required.")
             assert_that(response.json()["slug"][0]).is_equal_to("The slug field is required.")
             # response headers verification
             assert_that(response.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
-    def test_009_negative_perform_delete_on_search_endpoint(self):
-        response = requests.post(f"{URL}/brands/search", params={"q": "new"}, timeout=5)
+    def test_009_negative_perform_delete_on_search_endpoint(self, api_client):
+        response = api_client.post("/brands/search", params={"q": "new"})
         with soft_assertions():
             assert_that(response.status_code).is_equal_to(405)
+            assert_matches_schema(response.json(), ErrorMessage)
             assert_that(response.json()).contains_value("Method is not allowed for the requested route")
             # response headers verification
             assert_that(response.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
-    def test_010_destructive_create_brand_with_incorrect_payload(self):
+    def test_010_destructive_create_brand_with_incorrect_payload(self, api_client):
         name = f"name_{generate_random_string(500)}"
         slug = f"slug_{generate_random_string(500)}"
         payload = {
             "name": name,
             "slug": slug
         }
-        response = requests.post(f"{URL}/brands", json=payload, timeout=5)
+        response = api_client.post("/brands", json=payload)
         with soft_assertions():
             assert_that(response.status_code).is_equal_to(422)
+            assert_matches_schema(response.json(), ValidationErrors)
             assert_that(response.json()["name"][0]).is_equal_to(
                 "The name may not be greater than 120 characters."
             )
@@ -206,77 +200,86 @@ class TestBrandsMicroservice:
             # response headers verification
             assert_that(response.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
-    def test_011_destructive_create_brand_with_empty_payload(self):
-        response = requests.post(f"{URL}/brands", json={}, timeout=5)
+    def test_011_destructive_create_brand_with_empty_payload(self, api_client):
+        response = api_client.post("/brands", json={})
         with soft_assertions():
             assert_that(response.status_code).is_equal_to(422)
+            assert_matches_schema(response.json(), ValidationErrors)
             assert_that(response.json()["name"][0]).is_equal_to("The name field is required.")
             assert_that(response.json()["slug"][0]).is_equal_to("The slug field is required.")
             # response headers verification
             assert_that(response.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
-    def test_012_destructive_create_brand_with_invalid_payload(self):
+    def test_012_destructive_create_brand_with_invalid_payload(self, api_client):
         payload = {
             "name": {f"name_{generate_random_string(8)}": 0},
             "slug": [f"name_{generate_random_string(8)}"],
         }
-        response = requests.post(f"{URL}/brands", json=payload, timeout=5)
+        response = api_client.post("/brands", json=payload)
         with soft_assertions():
             assert_that(response.status_code).is_equal_to(422)
+            assert_matches_schema(response.json(), ValidationErrors)
             assert_that(response.json()["name"][0]).is_equal_to("The name must be a string.")
             assert_that(response.json()["slug"][0]).is_equal_to("The slug must be a string.")
             # response headers verification
             assert_that(response.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
-    @pytest.mark.parametrize("token", [{"email": ADMIN}], indirect=True)
-    def test_013_positive_delete_brand_auth_user(self, token, create_brand):
-        brand_id = create_brand["id"]
-        headers = {"Authorization": f"Bearer {token}"}
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("async_token", [{"email": ADMIN}], indirect=True)
+    async def test_013_positive_delete_brand_auth_user(self, async_api_client, async_token, async_create_brand):
+        brand_id = async_create_brand["id"]
+        headers = {"Authorization": f"Bearer {async_token}"}
 
-        response_del = requests.delete(f"{URL}/brands/{brand_id}", headers=headers, timeout=5)
+        response_del = await async_api_client.delete(f"/brands/{brand_id}", headers=headers)
         with soft_assertions():
             assert_that(response_del.status_code).is_equal_to(204)
             # response headers verification
             assert_that(response_del.headers).does_not_contain_key("Server")  # server information leakage
             assert_that(response_del.headers["Access-Control-Allow-Origin"]).is_equal_to("*")
             assert_that(response_del.headers["Cache-Control"]).is_equal_to("no-cache, private")
-            # response performance verification
-            assert_that(response_del.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
-    def test_014_negative_reject_unauthorized_delete(self, create_brand):
-        brand_id = create_brand["id"]
+    def test_014_negative_reject_unauthorized_delete(self, api_client, pooled_brand):
+        brand_id = pooled_brand["id"]
 
         headers = {"Authorization": f"Bearer fake_token"}
-        response_del = requests.delete(f"{URL}/brands/{brand_id}", headers=headers, timeout=5)
+        response_del = api_client.delete(f"/brands/{brand_id}", headers=headers)
         with soft_assertions():
             assert_that(response_del.status_code).is_equal_to(401)
+            assert_matches_schema(response_del.json(), ErrorMessage)
             assert_that(response_del.json()["message"]).is_equal_to("Unauthorized")
             # response headers verification
             assert_that(response_del.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response_del.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response_del.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
 
     @pytest.mark.parametrize("token", [{"email": USER1}], indirect=True)
-    def test_015_negative_reject_insufficient_permission_delete(self, create_brand, token):
-        brand_id = create_brand["id"]
+    def test_015_negative_reject_insufficient_permission_delete(self, api_client, pooled_brand, token):
+        brand_id = pooled_brand["id"]
         headers = {"Authorization": f"Bearer {token}"}
 
-        response_del = requests.delete(f"{URL}/brands/{brand_id}", headers=headers, timeout=5)
+        response_del = api_client.delete(f"/brands/{brand_id}", headers=headers)
         with soft_assertions():
             assert_that(response_del.status_code).is_equal_to(401)
+            assert_matches_schema(response_del.json(), ErrorMessage)
             assert_that(response_del.json()["message"]).is_equal_to("Unauthorized")
             # response headers verification
             assert_that(response_del.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response_del.headers["content-type"]).is_equal_to("application/json")
-            # response performance verification
-            assert_that(response_del.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
+
+    def test_016_negative_concurrent_post_brand_with_same_slug(self, benchmark_client):
+        result, violations = contend_post_same_slug(benchmark_client, requests=10)
+        assert_that(violations).described_as(f"statuses {dict(result.statuses)}").is_empty()
+
+    def test_017_negative_concurrent_update_to_same_name_and_slug(self, benchmark_client):
+        result, violations = contend_put_same_name(benchmark_client, requests=10)
+        assert_that(violations).described_as(f"statuses {dict(result.statuses)}").is_empty()
+
+    def test_018_destructive_fuzz_brand_validation(self, request, fuzz_client, fuzz_seed):
+        examples = request.config.getoption("fuzz_examples")
+        report = fuzz_brands(fuzz_client, examples, workers=8, seed=fuzz_seed)
+        with soft_assertions():
+            assert_that(report.sent).is_equal_to(examples)
+            for failure in report.failures[:5]:
+                assert_that(failure["reasons"]).described_as(describe(failure)).is_empty()
@@ -1,11 +1,11 @@
 import allure
-import requests
-
-from datetime import timedelta
+import asyncio
+import pytest
 
 from assertpy import assert_that, soft_assertions
 
-from resources.config import URL
+from resources.pagination import MatchesSchema, References, SortedBy, UniqueIds, iter_items, run_checks
+from resources.schemas import Product, ProductPage, assert_matches_schema
 
 
 @allure.description("""
@@ -37,47 +37,39 @@ identifier (ID). After successful deletion, the response confirms the deletion o
 """)
 class TestProductMicroservice:
 
-    def test_001_positive_get_products(self):
-        response = requests.get(f"{URL}/products", params={"sort": "name,asc"}, timeout=5)
-        response_2 = requests.get(f"{URL}/products", params={"sort": "name,asc"}, timeout=5)
-        response_data = [data["name"] for data in response.json()["data"]]
+    @pytest.mark.asyncio
+    async def test_001_positive_get_products(self, async_api_client):
+        # both fetches go to the API: the test compares two live responses
+        response, response_2 = await asyncio.gather(
+            async_api_client.get("/products", params={"sort": "name,asc"}, use_cache=False),
+            async_api_client.get("/products", params={"sort": "name,asc"}, use_cache=False),
+        )
+        payload = response.json()
+        response_data = [data["name"] for data in payload["data"]]
         with soft_assertions():
             # status code verification
             assert_that(response.status_code).is_equal_to(200)
             # response payload verification
-            assert_that(response.json()).is_instance_of(dict)
-            assert_that(response.json()["data"][0]["id"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["name"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["description"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["stock"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["price"]).is_instance_of(float)
-            assert_that(response.json()["data"][0]["is_location_offer"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["is_rental"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["brand_id"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["category_id"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["product_image_id"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["product_image"]).is_instance_of(dict)
-            assert_that(response.json()["data"][0]["product_image"]["id"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["product_image"]["by_name"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["product_image"]["by_url"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["product_image"]["source_name"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["product_image"]["source_url"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["product_image"]["file_name"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["product_image"]["title"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["category"]).is_instance_of(dict)
-            assert_that(response.json()["data"][0]["category"]["id"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["category"]["parent_id"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["category"]["name"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["category"]["slug"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["brand"]).is_instance_of(dict)
-            assert_that(response.json()["data"][0]["brand"]["id"]).is_instance_of(int)
-            assert_that(response.json()["data"][0]["brand"]["name"]).is_instance_of(str)
-            assert_that(response.json()["data"][0]["brand"]["slug"]).is_instance_of(str)
+            assert_that(payload["data"]).is_not_empty()
+            assert_matches_schema(payload, ProductPage)
             assert_that(response_data).is_equal_to(sorted(response_data))
             # response headers verification
             assert_that(response.headers["cache-control"]).is_equal_to("no-cache, private")
             assert_that(response.headers["content-type"]).is_equal_to("application/json;charset=UTF-8")
-            # response performance verification
-            assert_that(response.elapsed).is_less_than_or_equal_to(timedelta(milliseconds=800))
             # state validation
-            assert_that(response.json()).is_equal_to(response_2.json())
+            assert_that(payload).is_equal_to(response_2.json())
+
+    def test_002_positive_get_products_whole_catalogue(self, api_client):
+        brand_ids = [brand["id"] for brand in api_client.get("/brands").json()]
+        checks = [
+            SortedBy("name"),
+            UniqueIds(),
+            References("brand_id", brand_ids, embedded="brand"),
+            References("category_id", embedded="category"),
+            MatchesSchema(Product),
+        ]
+        count = run_checks(iter_items(api_client, "/products", params={"sort": "name,asc"}), checks)
+        with soft_assertions():
+            assert_that(count).is_greater_than(0)
+            for check in checks:
+                assert_that(check.violations).described_as(check.name).is_empty()
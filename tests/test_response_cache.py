@@ -0,0 +1,25 @@
+from assertpy import assert_that
+
+from resources.cache import ResponseCache
+
+
+def test_001_cache_key_includes_query_written_in_url():
+    cache = ResponseCache()
+    url = "http://api.test/products"
+
+    assert_that(cache.key(f"{url}?page=1")).is_not_equal_to(cache.key(f"{url}?page=3"))
+    assert_that(cache.key(f"{url}?page=3")).is_equal_to(cache.key(url, params={"page": 3}))
+    assert_that(cache.key(f"{url}?sort=name,asc&page=2")).is_equal_to(
+        cache.key(f"{url}?page=2", params={"sort": "name,asc"})
+    )
+
+
+def test_002_cache_key_accepts_every_params_form():
+    cache = ResponseCache()
+    url = "http://api.test/products"
+
+    assert_that(cache.key(url, params=[("page", 2)])).is_equal_to(cache.key(url, params={"page": 2}))
+    assert_that(cache.key(url, params=(("page", 2), ("sort", "name,asc")))).is_equal_to(
+        cache.key(url, params={"sort": "name,asc", "page": "2"})
+    )
+    assert_that(cache.key(url, params="page=2")).is_equal_to(cache.key(url, params={"page": 2}))